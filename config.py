@@ -5,6 +5,8 @@
 # ------------------
 LIGHT_ON_DURATION = 1000    # How long each light stays on
 TRANSITION_DELAY = 200      # Delay between one light turning off and the next turning on
+TREE_MODE = "classic"       # "classic" (durations above), "sportsman" (.500 full tree) or "pro" (.400, all ambers together)
+TREE_SPIN_WINDOW_US = 6000  # Busy-wait (still draining sensor edges and inputs) for a stage due within this many us so it lands on its deadline
 
 # ------------------
 # Race setup timing
@@ -42,8 +44,24 @@ LANE_SERVO_POSITIONS = [
 # ------------------
 # Main loop timing
 # ------------------
-LOOP_DELAY = 5              # Delay in main loop for timing responsiveness
-BUTTON_DEBOUNCE = 500       # Debounce time for buttons
+BUTTON_SETTLE_TIME = 30     # Start/reset buttons must hold steady this long before a press counts (ms)
+BUTTON_POLL_INTERVAL = 5    # How often the start and reset buttons are read (ms)
+INPUT_SAMPLE_INTERVAL_US = 1000  # How often player buttons and polled lane sensors are sampled (us)
+INPUT_FILTER_SAMPLES = 3    # Minimum pulse width in samples; shorter pulses on lane inputs are rejected as glitches
+INPUT_READ_MODE = "register" # "register" = read every lane input from one GPIO_IN snapshot, "pins" = one Pin.value() per input
+INPUT_TIMER_RATE_HZ = 0     # Sample lane inputs from a hardware timer at this rate (e.g. 10000); 0 = once per INPUT_SAMPLE_INTERVAL_US
+INPUT_TIMER_BUFFER_SIZE = 256  # Samples buffered between main loop drains (must cover INPUT_SAMPLE_INTERVAL_US at the timer rate)
+RACE_MONITOR_INTERVAL_US = 1000  # How often a running race is checked (simulation, timeout)
+SCHEDULER_WAKE_CHECK_US = 500    # While sleeping, how often to check for captured sensor edges
+
+# ------------------
+# Sensor capture settings
+# ------------------
+SENSOR_CAPTURE_MODE = "irq" # "irq" = timestamp beam breaks in pin interrupts, "poll" = read sensor pins once per loop pass,
+                            # "pio" = timestamp edges in PIO1 state machines (falls back to "poll" when PIO is unavailable)
+EDGE_BUFFER_SIZE = 64       # Number of slots in the IRQ beam-break ring buffer
+PIO_CAPTURE_FREQ = 15000000 # PIO capture clock; 15 cycles per sample gives 1 us timestamps
+                            # (each lane's finish pin must be the GPIO after its start pin)
 
 # ------------------
 # Display settings
@@ -53,14 +71,28 @@ NUM_LANES = 4                        # Define the number of lanes
 DISPLAYS_PER_LANE = 2                # Number of displays per lane (set to 2 for dual displays)
 I2C_SDA_PIN = 20                     # SDA pin for I2C (GPIO 20)
 I2C_SCL_PIN = 21                     # SCL pin for I2C (GPIO 21)
+I2C_FREQ = 400000                    # I2C clock (Hz) when I2C_BUSES is not set
 DISPLAY_BRIGHTNESS = 1               # Display brightness (0-15)
 
 # Display I2C addresses - set explicitly for each display
 # Format: [lane1_display1, lane1_display2, lane2_display1, lane2_display2, ...]
 DISPLAY_ADDRESSES = [0x70, 0x74, 0x71, 0x75, 0x72, 0x76, 0x73, 0x77, 0x78, 0x79]  # Adjust as needed
+
+# Display buses: each has its own pins, clock and address priority list. Displays are
+# assigned to lanes alternating between buses, so with two buses each lane's pair of
+# displays is split across them and their updates interleave. Add I2C1 to spread the load:
+#     {"id": 1, "sda": 2, "scl": 3, "freq": 400000, "addresses": [0x74, 0x75, 0x76, 0x77]},
+I2C_BUSES = [
+    {"id": 0, "sda": I2C_SDA_PIN, "scl": I2C_SCL_PIN, "freq": I2C_FREQ, "addresses": DISPLAY_ADDRESSES},
+]
+
 # Display cycling settings
 DISPLAY_CYCLE_ENABLED = True     # Enable cycling between different info on secondary displays
 DISPLAY_CYCLE_INTERVAL = 3000    # Time to display each piece of info (in milliseconds)
+DISPLAY_FLUSH_BUDGET_US = 2000   # I2C display writes per main loop pass stop after this long (the rest wait for the next pass)
+LIVE_CLOCK_ENABLED = False       # Show a running elapsed time on each lane's primary display during a race
+LIVE_CLOCK_HZ = 20               # Live clock refresh rate (halved automatically while the I2C bus falls behind)
+LIVE_CLOCK_MIN_HZ = 2            # Slowest rate the live clock backs off to
 
 # ------------------
 # Simulation settings
@@ -85,6 +117,21 @@ SEPARATION_LEDS = 0        # Number of LEDs to use as separation between lanes
 # Total number of LEDs needed with separation
 # NUM_LEDS = (LEDS_PER_LANE * NUM_LANES) + (SEPARATION_LEDS * (NUM_LANES - 1))
 NUM_LEDS = 43
+# LED strips, each on its own pin and PIO0 state machine (at most 4). LED_MAPPING and
+# AUX_LED_MAPPING entries are indices on the first strip, or ("strip name", index) pairs,
+# e.g. move the indicators to a second chain with {"name": "aux", "pin": 27, "leds": 15}
+LED_STRIPS = [
+    {"name": "main", "pin": WS2812B_PIN, "leds": NUM_LEDS},
+]
+LED_DMA_ENABLED = True     # Feed the LED strip by DMA so sending a frame never blocks (falls back to PIO FIFO writes)
+LED_LATCH_US = 280         # Calibrated delay from the last bit of a frame until the LEDs show it (WS2812B reset time; refine with a photodiode)
+LED_RECORDER_SIZE = 0      # Log this many flushed frames with timestamps for /api/frames (0 = off)
+LED_GAMMA = 2.2            # Gamma applied to brightness levels and color channels when frames are sent
+LED_BRIGHTNESS = {         # Brightness per LED group (0-255), changeable at runtime via /api/brightness
+    "tree": 255,
+    "indicators": 255,
+    "sensors": 255
+}
 # Define colors (in GRB order for WS2812B) - GRB, not RGB!
 YELLOW = 0xFFFF00          # Yellow (GRB: G=FF, R=FF, B=00)
 GREEN = 0xFF0000           # Green (GRB: G=FF, R=00, B=00)
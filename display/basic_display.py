@@ -19,12 +19,59 @@ CHARS = {
     ' ': 0x00, '_': 0x08, 'R': 0x50, 'N': 0x54, '.': 0x80
 }
 
+# Display RAM byte of each digit (0-3) - this mapping might need adjustment for your specific display
+POS_MAP = (0, 2, 6, 8)
+
+# Segment patterns of the digits 0-9, and the scale/rounding for 0-3 decimal places of seconds
+DIGITS = bytes(CHARS[str(d)] for d in range(10))
+MS_SCALE = (1000, 100, 10, 1)
+MS_ROUNDING = (500, 50, 5, 0)
+
+def encode_text(text):
+    """Encode text into four segment patterns (dots attach to the previous character, right-justified)"""
+    processed = []
+    for i, char in enumerate(text):
+        if char == '.' and i > 0:
+            # Attach decimal point to previous character
+            processed[-1] |= 0x80
+        else:
+            processed.append(CHARS.get(char, 0))
+    
+    # Right-justify and truncate to 4 characters
+    while len(processed) < 4:
+        processed.insert(0, 0)
+    return bytes(processed[-4:])
+
+# Pre-encoded words; other strings are encoded on first use (up to GLYPH_CACHE_SIZE of them)
+WORDS = ("RDY-", "STBY", "FOUL", "RED-", "RACE", "POS", "ERLY")
+GLYPH_CACHE_SIZE = 32
+GLYPH_CACHE = {word: encode_text(word) for word in WORDS}
+
+def glyphs(text):
+    """Return the cached segment patterns for text"""
+    patterns = GLYPH_CACHE.get(text)
+    if patterns is None:
+        patterns = encode_text(text)
+        if len(GLYPH_CACHE) < GLYPH_CACHE_SIZE:
+            GLYPH_CACHE[text] = patterns
+    return patterns
+
 class BasicDisplay:
     def __init__(self, i2c, address=0x70):
         self.i2c = i2c
         self.address = address
         self.buffer = bytearray(16)  # 8 two-byte words = 16 bytes
         
+        # Shadow of the display RAM as last written, so unchanged updates cost no I2C traffic
+        self.shadow = bytearray(16)
+        self.shadow_valid = False    # Display RAM contents are unknown until the first full write
+        self.tx = bytearray(17)      # Transmit buffer: register address byte followed by data
+        self.tx_view = memoryview(self.tx)
+        self.cmd = bytearray(1)
+        self.brightness = None
+        self.writes = 0              # Buffer writes sent
+        self.skipped = 0             # Buffer writes skipped because nothing changed
+        
         # Initialize display
         self._write_cmd(CMD_SYSTEM_SETUP | 1)  # Turn on oscillator
         self._write_cmd(CMD_DISPLAY_SETUP | 1)  # Turn on display
@@ -33,21 +80,55 @@ class BasicDisplay:
     
     def _write_cmd(self, cmd):
         """Write a single command byte to the device"""
-        self.i2c.writeto(self.address, bytes([cmd]))
+        self.cmd[0] = cmd
+        self.i2c.writeto(self.address, self.cmd)
     
     def _write_buffer(self):
-        """Write the entire buffer to the device"""
-        self.i2c.writeto(self.address, bytes([0]) + self.buffer)  # First byte is register address (0)
+        """Write the bytes that differ from the shadow (one transaction, or none if nothing changed)"""
+        buffer = self.buffer
+        shadow = self.shadow
+        if self.shadow_valid:
+            if buffer == shadow:
+                self.skipped += 1
+                return False
+            first = 0
+            while buffer[first] == shadow[first]:
+                first += 1
+            last = 15
+            while buffer[last] == shadow[last]:
+                last -= 1
+        else:
+            first = 0
+            last = 15
+        
+        # The HT16K33 auto-increments its RAM address, so the changed range goes out as
+        # [start address, data...]; the address byte sits just before the data in tx
+        tx = self.tx
+        tx[first] = first
+        for i in range(first, last + 1):
+            tx[i + 1] = buffer[i]
+        self.i2c.writeto(self.address, self.tx_view[first:last + 2])
+        
+        # Only trust the shadow once the write went through
+        shadow[first:last + 1] = buffer[first:last + 1]
+        self.shadow_valid = True
+        self.writes += 1
+        return True
     
     def set_brightness(self, level):
         """Set brightness level (0-15)"""
         level = max(0, min(15, level))
-        self._write_cmd(CMD_BRIGHTNESS | level)
+        if level != self.brightness:
+            self._write_cmd(CMD_BRIGHTNESS | level)
+            self.brightness = level
     
-    def clear(self):
-        """Clear the display buffer"""
+    def _clear_buffer(self):
         for i in range(16):
             self.buffer[i] = 0
+    
+    def clear(self):
+        """Clear the display (no I2C traffic if it is already blank)"""
+        self._clear_buffer()
         self._write_buffer()
     
     def _set_digit(self, pos, pattern, dot=False):
@@ -55,42 +136,53 @@ class BasicDisplay:
         if 0 <= pos < 4:
             if dot:
                 pattern |= 0x80  # Set decimal point
-            # Map positions - this mapping might need adjustment for your specific display
-            pos_map = {0: 0, 1: 2, 2: 6, 3: 8}  # These are word addresses in the HT16K33
-            self.buffer[pos_map[pos]] = pattern
-            self.buffer[pos_map[pos] + 1] = 0  # Clear the high byte
+            addr = POS_MAP[pos]
+            self.buffer[addr] = pattern
+            self.buffer[addr + 1] = 0  # Clear the high byte
+    
+    def show_patterns(self, patterns):
+        """Show four pre-encoded segment patterns (see encode_text)"""
+        buffer = self.buffer
+        for i in range(4):
+            addr = POS_MAP[i]
+            buffer[addr] = patterns[i]
+            buffer[addr + 1] = 0
+        self._write_buffer()
     
     def show_text(self, text):
-        """Show text on the display"""
-        self.clear()
-        
-        # Process text to handle decimal points
-        processed = []
-        for i, char in enumerate(text):
-            if char == '.' and i > 0:
-                # Attach decimal point to previous character
-                processed[-1] = (processed[-1][0], True)
-            else:
-                processed.append((char, False))
-        
-        # Right-justify and truncate to 4 characters
-        while len(processed) < 4:
-            processed.insert(0, (' ', False))
-        if len(processed) > 4:
-            processed = processed[-4:]
-        
-        # Display each character
-        for i, (char, dot) in enumerate(processed):
-            pattern = CHARS.get(char, 0)
-            self._set_digit(i, pattern, dot)
+        """Show text on the display (encoded once per distinct string, only changed bytes are written)"""
+        self.show_patterns(glyphs(text))
+    
+    def show_ms(self, time_ms, decimal_places=3):
+        """Show a time in integer milliseconds as seconds, straight from the digit table (no float or str)"""
+        negative = time_ms < 0
+        value = -time_ms if negative else time_ms
+        value = (value + MS_ROUNDING[decimal_places]) // MS_SCALE[decimal_places]
+        buffer = self.buffer
+        self._clear_buffer()
         
+        # Fill digits from the right; like show_text, only the last four characters are kept
+        pos = 3
+        digits = 0
+        while pos >= 0 and (value or digits <= decimal_places):
+            pattern = DIGITS[value % 10]
+            if decimal_places and digits == decimal_places:
+                pattern |= 0x80  # Decimal point after the units digit
+            buffer[POS_MAP[pos]] = pattern
+            value //= 10
+            digits += 1
+            pos -= 1
+        if negative and pos >= 0:
+            buffer[POS_MAP[pos]] = CHARS['-']
         self._write_buffer()
     
     def show_number(self, number, decimal_places=2):
-        """Show a number with the specified decimal places"""
-        if decimal_places > 0:
-            text = "{:.{dp}f}".format(number, dp=decimal_places)
-        else:
-            text = str(int(number))
-        
-        self.show_text(text)
+        """Show a number with the specified decimal places (truncated to an integer for none)"""
+        if decimal_places <= 0:
+            # Whole numbers truncate toward zero, like int(); only fractional places round
+            self.show_ms(int(number) * 1000, 0)
+            return
+        if decimal_places <= 3:
+            self.show_ms(int(round(number * 1000)), decimal_places)
+            return
+        self.show_text("{:.{dp}f}".format(number, dp=decimal_places))
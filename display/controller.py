@@ -1,7 +1,8 @@
 # Display Controller for Raspberry Pi Pico Drag Race Controller
-from machine import I2C, Pin
-import time
 import config
+from timing.timebase import ticks_us64
+from display.update_queue import UpdateQueue
+from display.i2c_bus import create_buses
 
 # Import display libraries - add a try-except block to handle missing libraries gracefully
 try:
@@ -15,15 +16,28 @@ class DisplayController:
     def __init__(self, num_lanes):
         print("DisplayController: Initializing...")
         self.displays = []  # Will be a 2D array: [lane][display_index]
+        self.buses = []     # TimedI2C per configured bus
         self.num_lanes = num_lanes
         
         # Add display cycling variables
         self.cycle_enabled = config.DISPLAY_CYCLE_ENABLED
         self.cycle_interval = config.DISPLAY_CYCLE_INTERVAL
-        self.cycle_last_change = [0] * num_lanes  # Last change time for each lane
+        self.cycle_last_change = [0] * num_lanes  # Last change time for each lane (us)
         self.cycle_current_mode = [0] * num_lanes  # Current display mode for each lane
                                                    # 0 = reaction time, 1 = status
         
+        # Display writes are queued (latest value per display wins) and sent by the main loop
+        self.queue = UpdateQueue(getattr(config, 'DISPLAY_FLUSH_BUDGET_US', 2000))
+        
+        # Live elapsed-time clock on the primary displays while a race runs
+        self.live_enabled = getattr(config, 'LIVE_CLOCK_ENABLED', False)
+        self.live_min_interval = 1000000 // getattr(config, 'LIVE_CLOCK_HZ', 20)
+        self.live_max_interval = 1000000 // getattr(config, 'LIVE_CLOCK_MIN_HZ', 2)
+        self.live_interval = self.live_min_interval  # Current tick interval (us), backs off when writes lag
+        self.live_lanes = None                       # Lanes being clocked, None when stopped
+        self.live_next = 0
+        self.live_backoffs = 0
+        
         print(f"DisplayController: DISPLAY_ENABLED={config.DISPLAY_ENABLED}, LIBRARIES_AVAILABLE={DISPLAY_LIBRARIES_AVAILABLE}")
         
         if not config.DISPLAY_ENABLED or not DISPLAY_LIBRARIES_AVAILABLE:
@@ -31,42 +45,33 @@ class DisplayController:
             return
             
         try:
-            # Initialize I2C0 on GPIO 20 (SDA) and GPIO 21 (SCL)
-            print(f"DisplayController: Initializing I2C on SDA={config.I2C_SDA_PIN}, SCL={config.I2C_SCL_PIN}")
-            i2c = I2C(0, sda=Pin(config.I2C_SDA_PIN), scl=Pin(config.I2C_SCL_PIN))
+            # Initialize each configured I2C bus and find its displays
+            self.buses = create_buses()
+            bus_addresses = []
+            for bus in self.buses:
+                discovered_addresses = bus.scan()
+                print(f"DisplayController: I2C{bus.bus_id} scan found {len(discovered_addresses)} devices: {[hex(d) for d in discovered_addresses]}")
+                # Configured addresses act as a priority order; other discovered addresses follow
+                bus_addresses.append(bus.ordered_addresses(discovered_addresses))
             
-            # Scan I2C bus and find available display addresses
-            discovered_addresses = i2c.scan()
-            print(f"DisplayController: I2C scan found {len(discovered_addresses)} devices: {[hex(d) for d in discovered_addresses]}")
+            # Alternate between buses so each lane's displays sit on different buses
+            # and updates to them interleave across the buses
+            assigned_addresses = []  # (bus, address)
+            for i in range(max([len(addresses) for addresses in bus_addresses] + [0])):
+                for bus, addresses in zip(self.buses, bus_addresses):
+                    if i < len(addresses):
+                        assigned_addresses.append((bus, addresses[i]))
             
             # Calculate number of displays we need
             total_displays_needed = num_lanes * config.DISPLAYS_PER_LANE
             
             # Check if we have enough displays
-            if len(discovered_addresses) < total_displays_needed:
-                print(f"WARNING: Found only {len(discovered_addresses)} displays, but need {total_displays_needed} for {num_lanes} lanes with {config.DISPLAYS_PER_LANE} displays per lane")
+            if len(assigned_addresses) < total_displays_needed:
+                print(f"WARNING: Found only {len(assigned_addresses)} displays, but need {total_displays_needed} for {num_lanes} lanes with {config.DISPLAYS_PER_LANE} displays per lane")
                 print("Some lanes may not have all required displays")
             
-            # Auto-assign addresses to lanes
-            assigned_addresses = []
-            
-            # If DISPLAY_ADDRESSES is defined in config, use it as a priority order
-            # This allows users to still control ordering if needed
-            if hasattr(config, 'DISPLAY_ADDRESSES') and config.DISPLAY_ADDRESSES:
-                # Use configured addresses as priority list, but only if they exist
-                for addr in config.DISPLAY_ADDRESSES:
-                    if addr in discovered_addresses:
-                        assigned_addresses.append(addr)
-                        
-                # Add any additional discovered addresses not in the config list
-                for addr in discovered_addresses:
-                    if addr not in assigned_addresses:
-                        assigned_addresses.append(addr)
-            else:
-                # Just use discovered addresses in the order found
-                assigned_addresses = discovered_addresses
-            
-            print(f"DisplayController: Using displays with addresses: {[hex(a) for a in assigned_addresses]}")
+            names = ["I2C{}:{}".format(bus.bus_id, hex(address)) for bus, address in assigned_addresses]
+            print(f"DisplayController: Using displays: {names}")
             
             # Initialize displays grouped by lane
             for lane_id in range(1, num_lanes + 1):
@@ -77,15 +82,15 @@ class DisplayController:
                     addr_idx = (lane_id - 1) * config.DISPLAYS_PER_LANE + disp_idx
                     
                     if addr_idx < len(assigned_addresses):
-                        address = assigned_addresses[addr_idx]
+                        bus, address = assigned_addresses[addr_idx]
                         
                         # Create and configure the display
                         try:
                             # Create a basic display instance
-                            display = BasicDisplay(i2c, address)
+                            display = BasicDisplay(bus, address)
                             display.set_brightness(config.DISPLAY_BRIGHTNESS)
                             lane_displays.append(display)
-                            print(f"Initialized display {disp_idx+1} for Lane {lane_id} at address 0x{address:02x}")
+                            print(f"Initialized display {disp_idx+1} for Lane {lane_id} at I2C{bus.bus_id} address 0x{address:02x}")
                         except Exception as e:
                             print(f"Error initializing display {disp_idx+1} for Lane {lane_id}: {e}")
                             lane_displays.append(None)  # Add None placeholder to maintain array structure
@@ -114,7 +119,7 @@ class DisplayController:
             # Update specific display if requested
             if display_index < len(lane_displays) and lane_displays[display_index] is not None:
                 try:
-                    lane_displays[display_index].show_text(message)
+                    self.queue.text(lane_displays[display_index], message)
                 except Exception as e:
                     print(f"Error updating display {display_index} for lane {lane_index}: {e}")
         else:
@@ -122,38 +127,35 @@ class DisplayController:
             for i, display in enumerate(lane_displays):
                 if display is not None:
                     try:
-                        display.show_text(message)
+                        self.queue.text(display, message)
                     except Exception as e:
                         print(f"Error updating display {i} for lane {lane_index}: {e}")
             
     def show_time(self, lane_index, time_ms):
-        """Show race time on a lane's primary display"""
+        """Show race time on a lane's primary display (time_ms is rounded from microseconds, so thousandths are real)"""
         if not config.DISPLAY_ENABLED or not self.displays or lane_index >= len(self.displays):
             return
                 
-        time_sec = time_ms / 1000.0
-        
         # Format time with appropriate decimal places
         try:
-            if time_sec < 10:
-                # For shorter times, show 3 decimal places
-                if len(self.displays[lane_index]) > 0 and self.displays[lane_index][0] is not None:
-                    self.displays[lane_index][0].show_number(time_sec, decimal_places=3)
-            else:
-                # For longer times, show 2 decimal places
-                if len(self.displays[lane_index]) > 0 and self.displays[lane_index][0] is not None:
-                    self.displays[lane_index][0].show_number(time_sec, decimal_places=2)
+            if len(self.displays[lane_index]) > 0 and self.displays[lane_index][0] is not None:
+                # 3 decimal places for shorter times, 2 for longer ones
+                self.queue.time_ms(self.displays[lane_index][0], time_ms, self._time_decimals(time_ms))
                         
             # Show "RACE" on second display if available
             if len(self.displays[lane_index]) > 1 and self.displays[lane_index][1] is not None:
-                self.displays[lane_index][1].show_text("RACE")
+                self.queue.text(self.displays[lane_index][1], "RACE")
                     
             # Reset cycle timing to start the cycle again
-            self.cycle_last_change[lane_index] = time.ticks_ms()
+            self.cycle_last_change[lane_index] = ticks_us64()
             self.cycle_current_mode[lane_index] = 1  # Start with status
         except Exception as e:
             print(f"Error updating time displays for lane {lane_index}: {e}")
     
+    def _time_decimals(self, time_ms):
+        """Decimal places used for a time: 3 below 10 seconds, else 2"""
+        return 3 if time_ms < 10000 else 2
+    
     def _centered_position_str(self, position):
         """Create a centered position string (for 4-digit display)"""
         # For single digit positions (1-9)
@@ -177,18 +179,18 @@ class DisplayController:
             # If only one display per lane, show position briefly and then 
             # let cycling show race time alternating with position
             if len(self.displays[lane_index]) == 1 and self.displays[lane_index][0] is not None:
-                self.displays[lane_index][0].show_text(pos_str)
+                self.queue.text(self.displays[lane_index][0], pos_str)
             else:
                 # Show position on primary display if in dual display mode
                 if len(self.displays[lane_index]) > 0 and self.displays[lane_index][0] is not None:
-                    self.displays[lane_index][0].show_text(pos_str)
+                    self.queue.text(self.displays[lane_index][0], pos_str)
                     
                 # Show "POS" on second display to indicate position is showing
                 if len(self.displays[lane_index]) > 1 and self.displays[lane_index][1] is not None:
-                    self.displays[lane_index][1].show_text("POS")
+                    self.queue.text(self.displays[lane_index][1], "POS")
                     
             # Reset cycle timing to start the cycle again
-            self.cycle_last_change[lane_index] = time.ticks_ms()
+            self.cycle_last_change[lane_index] = ticks_us64()
             self.cycle_current_mode[lane_index] = 1  # Start with status
         except Exception as e:
             print(f"Error updating position displays for lane {lane_index}: {e}")
@@ -198,11 +200,9 @@ class DisplayController:
         if len(self.displays[lane_index]) <= 1 or self.displays[lane_index][1] is None:
             return
             
-        reaction_time_sec = abs(reaction_time_ms) / 1000.0
-        
         try:
             # Show the reaction time on the second display
-            self.displays[lane_index][1].show_number(reaction_time_sec, decimal_places=3)
+            self.queue.time_ms(self.displays[lane_index][1], abs(reaction_time_ms), 3)
         except Exception as e:
             print(f"Error updating reaction time display for lane {lane_index}: {e}")
             
@@ -219,10 +219,10 @@ class DisplayController:
         if reaction_time_ms < 0:
             # For false starts, show "ERLY" label on main display
             if self.displays[lane_index][0] is not None:
-                self.displays[lane_index][0].show_text("ERLY")
+                self.queue.text(self.displays[lane_index][0], "ERLY")
         
         # Reset cycle timing
-        self.cycle_last_change[lane_index] = time.ticks_ms()
+        self.cycle_last_change[lane_index] = ticks_us64()
         self.cycle_current_mode[lane_index] = 0  # Start with reaction time
         
         # Update the reaction time display
@@ -236,14 +236,14 @@ class DisplayController:
         # Show "RDY-" on primary display
         if len(self.displays[lane_index]) > 0 and self.displays[lane_index][0] is not None:
             try:
-                self.displays[lane_index][0].show_text("RDY-")
+                self.queue.text(self.displays[lane_index][0], "RDY-")
             except Exception as e:
                 print(f"Error updating ready display for lane {lane_index}: {e}")
         
         # Show "STBY" on second display if available
         if len(self.displays[lane_index]) > 1 and self.displays[lane_index][1] is not None:
             try:
-                self.displays[lane_index][1].show_text("STBY")
+                self.queue.text(self.displays[lane_index][1], "STBY")
             except Exception as e:
                 print(f"Error updating standby display for lane {lane_index}: {e}")
         
@@ -255,14 +255,14 @@ class DisplayController:
         # Show "FOUL" on primary display
         if len(self.displays[lane_index]) > 0 and self.displays[lane_index][0] is not None:
             try:
-                self.displays[lane_index][0].show_text("FOUL")
+                self.queue.text(self.displays[lane_index][0], "FOUL")
             except Exception as e:
                 print(f"Error updating false start display for lane {lane_index}: {e}")
         
         # Show "RED-" on second display if available
         if len(self.displays[lane_index]) > 1 and self.displays[lane_index][1] is not None:
             try:
-                self.displays[lane_index][1].show_text("RED-")
+                self.queue.text(self.displays[lane_index][1], "RED-")
             except Exception as e:
                 print(f"Error updating false start display for lane {lane_index}: {e}")
     
@@ -271,7 +271,7 @@ class DisplayController:
         if not config.DISPLAY_ENABLED or not self.displays:
             return
         
-        current_time = time.ticks_ms()
+        current_time = ticks_us64()
         
         # Check each lane for cycling
         for lane_idx in range(len(self.displays)):
@@ -285,10 +285,12 @@ class DisplayController:
                     break
             
             if lane is None:
+                # Nothing to cycle; check again next interval
+                self.cycle_last_change[lane_idx] = current_time
                 continue
             
             # Skip if not enough time passed for cycling
-            if time.ticks_diff(current_time, self.cycle_last_change[lane_idx]) < self.cycle_interval:
+            if current_time - self.cycle_last_change[lane_idx] < self.cycle_interval * 1000:
                 continue
                 
             # Reset cycle timer
@@ -305,20 +307,16 @@ class DisplayController:
                 if lane.finish_time is not None and lane.place is not None:
                     if self.cycle_current_mode[lane_idx] == 0:
                         # Show race time
-                        time_sec = lane.finish_time / 1000.0
-                        if time_sec < 10:
-                            primary_display.show_number(time_sec, decimal_places=3)
-                        else:
-                            primary_display.show_number(time_sec, decimal_places=2)
+                        self.queue.time_ms(primary_display, lane.finish_time, self._time_decimals(lane.finish_time))
                     else:
                         # Show position as centered number
-                        primary_display.show_text(self._centered_position_str(lane.place))
+                        self.queue.text(primary_display, self._centered_position_str(lane.place))
                 elif lane.false_start:
                     # For false starts, alternate between "FOUL" and "RED-"
                     if self.cycle_current_mode[lane_idx] == 0:
-                        primary_display.show_text("FOUL")
+                        self.queue.text(primary_display, "FOUL")
                     else:
-                        primary_display.show_text("RED-")
+                        self.queue.text(primary_display, "RED-")
                         
             # If we have dual displays per lane, use the existing logic
             elif len(self.displays[lane_idx]) > 1 and self.displays[lane_idx][1] is not None:
@@ -330,23 +328,23 @@ class DisplayController:
                     if lane.reaction_time is not None:
                         self.update_reaction_display(lane_idx, lane.reaction_time)
                     elif lane.false_start:
-                        secondary_display.show_text("RED-")
+                        self.queue.text(secondary_display, "RED-")
                     else:
-                        secondary_display.show_text("STBY")
+                        self.queue.text(secondary_display, "STBY")
                 else:
                     # Show status info
                     if lane.false_start:
-                        secondary_display.show_text("FOUL")
+                        self.queue.text(secondary_display, "FOUL")
                     elif lane.place is not None:
                         # Show the position number in dual display mode
                         if lane.place < 10:
-                            secondary_display.show_text(f" {lane.place}  ")  # Centered single digit
+                            self.queue.text(secondary_display, f" {lane.place}  ")  # Centered single digit
                         else:
-                            secondary_display.show_text(f"{lane.place}  ")   # Double digit
+                            self.queue.text(secondary_display, f"{lane.place}  ")   # Double digit
                     elif lane.reaction_time is not None:
-                        secondary_display.show_text("RACE")
+                        self.queue.text(secondary_display, "RACE")
                     else:
-                        secondary_display.show_text("STBY")         
+                        self.queue.text(secondary_display, "STBY")         
                 
 
     
@@ -358,6 +356,83 @@ class DisplayController:
         # Use the new generic display update method
         self.update_displays()
         
+    def next_cycle_deadline(self):
+        """Return when the next lane display is due to cycle (64-bit us), or None when cycling is off"""
+        if not self.cycle_enabled or not self.displays:
+            return None
+        return min(self.cycle_last_change[:len(self.displays)]) + self.cycle_interval * 1000
+        
+    def start_live_clock(self, lanes):
+        """Start ticking elapsed time on the primary displays of lanes (called at green)"""
+        if not self.live_enabled or not self.displays:
+            return
+        self.live_lanes = lanes
+        self.live_interval = self.live_min_interval
+        self.live_next = ticks_us64()
+    
+    def stop_live_clock(self):
+        """Stop the live clock (displays keep what they show)"""
+        self.live_lanes = None
+    
+    def update_live_clock(self):
+        """Post each running lane's elapsed time; finished lanes keep their exact finish time"""
+        if self.live_lanes is None:
+            return
+        now = ticks_us64()
+        lagging = False
+        running = False
+        for lane in self.live_lanes:
+            index = lane.lane_id - 1
+            if lane.start_time is None or lane.finish_time_us is not None or lane.false_start:
+                continue
+            if index >= len(self.displays) or not self.displays[index] or self.displays[index][0] is None:
+                continue
+            running = True
+            display = self.displays[index][0]
+            if self.queue.is_pending(display):
+                # The previous tick has not reached the bus yet
+                lagging = True
+            elapsed_ms = max(0, now - lane.start_time) // 1000
+            self.queue.time_ms(display, elapsed_ms, self._time_decimals(elapsed_ms))
+        if not running:
+            self.live_lanes = None
+            return
+        
+        # Back off while the bus can't keep up, then creep back to the configured rate
+        if lagging:
+            self.live_interval = min(self.live_interval * 2, self.live_max_interval)
+            self.live_backoffs += 1
+        elif self.live_interval > self.live_min_interval:
+            self.live_interval = max(self.live_interval * 3 // 4, self.live_min_interval)
+        self.live_next = now + self.live_interval
+    
+    def next_live_deadline(self):
+        """Return when the live clock next ticks (64-bit us), or None when it is stopped"""
+        if self.live_lanes is None:
+            return None
+        return self.live_next
+    
+    def flush_updates(self):
+        """Write queued display updates within the per-pass budget (main loop task)"""
+        self.queue.flush()
+    
+    def get_live_clock_stats(self):
+        """Return live clock state for diagnostics"""
+        return {
+            'enabled': self.live_enabled,
+            'running': self.live_lanes is not None,
+            'rate_hz': 1000000 // self.live_interval,
+            'backoffs': self.live_backoffs
+        }
+    
+    def get_bus_stats(self):
+        """Return per-bus I2C transaction timing for diagnostics"""
+        return [bus.get_stats() for bus in self.buses]
+    
+    def next_update_deadline(self):
+        """Return 0 while display updates are queued, or None when there is nothing to write"""
+        return self.queue.next_deadline()
+        
     def clear_all(self):
         """Clear all displays"""
         if not config.DISPLAY_ENABLED or not self.displays:
@@ -367,6 +442,6 @@ class DisplayController:
             for display in lane_displays:
                 if display is not None:
                     try:
-                        display.clear()
+                        self.queue.clear(display)
                     except Exception as e:
                         print(f"Error clearing display: {e}")
\ No newline at end of file
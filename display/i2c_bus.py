@@ -0,0 +1,90 @@
+# I2C buses for the lane displays on Raspberry Pi Pico Drag Race Controller
+# Each configured bus (I2C0/I2C1) gets its own pins and clock, and counts the time spent
+# in every transaction so slow or overloaded buses show up in diagnostics.
+import time
+from machine import I2C, Pin
+import config
+
+class TimedI2C:
+    def __init__(self, bus_id, sda, scl, freq=400000, addresses=None):
+        """
+        One hardware I2C bus with per-transaction timing
+
+        Parameters:
+        bus_id (int): Hardware I2C block (0 or 1)
+        sda (int): SDA GPIO
+        scl (int): SCL GPIO
+        freq (int): Bus clock in Hz
+        addresses (list, optional): Display addresses on this bus in lane priority order
+        """
+        self.bus_id = bus_id
+        self.freq = freq
+        self.addresses = addresses or []
+        self.i2c = I2C(bus_id, sda=Pin(sda), scl=Pin(scl), freq=freq)
+
+        # Diagnostics
+        self.transactions = 0
+        self.bytes = 0
+        self.total_us = 0
+        self.max_us = 0
+        self.errors = 0
+
+    def writeto(self, address, buf):
+        """Write buf to the device at address, timing the transaction"""
+        start = time.ticks_us()
+        try:
+            self.i2c.writeto(address, buf)
+        except OSError:
+            self.errors += 1
+            raise
+        finally:
+            elapsed = time.ticks_diff(time.ticks_us(), start)
+            self.transactions += 1
+            self.total_us += elapsed
+            if elapsed > self.max_us:
+                self.max_us = elapsed
+        self.bytes += len(buf)
+
+    def scan(self):
+        """Return the addresses of the devices on this bus"""
+        return self.i2c.scan()
+
+    def ordered_addresses(self, discovered):
+        """Return discovered addresses with the configured ones first, in their configured order"""
+        ordered = [addr for addr in self.addresses if addr in discovered]
+        ordered.extend(addr for addr in discovered if addr not in ordered)
+        return ordered
+
+    def get_stats(self):
+        """Return transaction timing for diagnostics"""
+        return {
+            'bus': self.bus_id,
+            'freq': self.freq,
+            'transactions': self.transactions,
+            'bytes': self.bytes,
+            'avg_us': self.total_us // self.transactions if self.transactions else 0,
+            'max_us': self.max_us,
+            'errors': self.errors
+        }
+
+def bus_configs():
+    """Return the configured display buses (config.I2C_BUSES, or the single-bus settings)"""
+    buses = getattr(config, 'I2C_BUSES', None)
+    if buses:
+        return buses
+    return [{"id": 0, "sda": config.I2C_SDA_PIN, "scl": config.I2C_SCL_PIN,
+             "freq": getattr(config, 'I2C_FREQ', 400000),
+             "addresses": getattr(config, 'DISPLAY_ADDRESSES', [])}]
+
+def create_buses():
+    """Create a TimedI2C for each configured bus, skipping buses that fail to start"""
+    buses = []
+    for bus_config in bus_configs():
+        try:
+            bus = TimedI2C(bus_config["id"], bus_config["sda"], bus_config["scl"],
+                           bus_config.get("freq", 400000), bus_config.get("addresses"))
+            print(f"I2C{bus.bus_id}: SDA={bus_config['sda']}, SCL={bus_config['scl']}, {bus.freq // 1000} kHz")
+            buses.append(bus)
+        except Exception as e:
+            print(f"I2C{bus_config['id']}: Failed to initialize ({e})")
+    return buses
@@ -0,0 +1,114 @@
+# Deferred display updates for Raspberry Pi Pico Drag Race Controller
+# Display requests only record the latest value per display; the main loop writes them to
+# the I2C bus when idle, within a time budget per pass, so slow writes never sit between
+# two lanes' sensor checks. Writes alternate between I2C buses when displays share out
+# across several, so one slow bus does not hold up the others.
+import time
+
+# Request kinds
+TEXT = 0
+TIME_MS = 1
+CLEAR = 2
+
+class UpdateQueue:
+    def __init__(self, budget_us=2000):
+        """
+        Parameters:
+        budget_us (int): Time per flush after which the remaining displays wait for the next pass
+        """
+        self.budget_us = budget_us
+        self.pending = {}  # display -> latest request (kind, value, decimals)
+        self.order = []    # Displays with a pending request, oldest first
+        self.shown = {}    # display -> request last written
+
+        # Diagnostics
+        self.posted = 0
+        self.dropped = 0     # Requests identical to what the display already shows
+        self.coalesced = 0   # Pending requests replaced by a newer one before being written
+        self.written = 0
+        self.errors = 0
+        self.max_flush_us = 0
+
+    def post(self, display, kind, value=None, decimals=0):
+        """Record a request for display; the latest one wins and repeats of the shown value are dropped"""
+        request = (kind, value, decimals)
+        self.posted += 1
+        if display in self.pending:
+            self.pending[display] = request
+            self.coalesced += 1
+        elif self.shown.get(display) == request:
+            self.dropped += 1
+        else:
+            self.pending[display] = request
+            self.order.append(display)
+
+    def text(self, display, text):
+        """Queue text for display"""
+        self.post(display, TEXT, text)
+
+    def time_ms(self, display, time_ms, decimals=3):
+        """Queue a millisecond time for display"""
+        self.post(display, TIME_MS, time_ms, decimals)
+
+    def clear(self, display):
+        """Queue blanking display"""
+        self.post(display, CLEAR)
+
+    def flush(self):
+        """Write pending requests, oldest first, until the budget is used; returns the number written"""
+        start = time.ticks_us()
+        count = 0
+        last_bus = None
+        while self.order:
+            display = self.order.pop(self._next_index(last_bus))
+            last_bus = display.i2c
+            kind, value, decimals = request = self.pending.pop(display)
+            try:
+                if kind == TEXT:
+                    display.show_text(value)
+                elif kind == TIME_MS:
+                    display.show_ms(value, decimals)
+                else:
+                    display.clear()
+                self.shown[display] = request
+                self.written += 1
+            except Exception as e:
+                # Forget what it shows so the next request is written again
+                self.shown.pop(display, None)
+                self.errors += 1
+                print(f"Error updating display 0x{display.address:02x}: {e}")
+            count += 1
+            if time.ticks_diff(time.ticks_us(), start) >= self.budget_us:
+                break
+        elapsed = time.ticks_diff(time.ticks_us(), start)
+        if elapsed > self.max_flush_us:
+            self.max_flush_us = elapsed
+        return count
+
+    def is_pending(self, display):
+        """Return True while a request for display is waiting to be written"""
+        return display in self.pending
+
+    def _next_index(self, last_bus):
+        """Return the position of the oldest pending display on a different bus than last_bus"""
+        order = self.order
+        for i in range(len(order)):
+            if order[i].i2c is not last_bus:
+                return i
+        return 0
+
+    def next_deadline(self):
+        """Scheduler deadline: now while anything is pending, else idle"""
+        return 0 if self.order else None
+
+    def get_stats(self):
+        """Return queue counters for diagnostics"""
+        return {
+            'pending': len(self.order),
+            'posted': self.posted,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+            'written': self.written,
+            'errors': self.errors,
+            'max_flush_us': self.max_flush_us
+        }
@@ -0,0 +1,17 @@
+# Inputs package for Raspberry Pi Pico Drag Race Controller
+# This file makes the directory a package
+
+from inputs.edge_buffer import EdgeBuffer
+from inputs.debounce import Debouncer, PRESSED, RELEASED
+from inputs.pio_capture import PioEdgeDecoder, PioEdgeCapture, create_pio_capture
+from inputs.vertical_counter import VerticalCounter
+from inputs.lane_inputs import LaneInputs
+from inputs.gpio_snapshot import GpioInRegister, PinSnapshot, FakeGpioRegister, create_gpio_source
+from inputs.timer_sampler import TimerSampler, create_timer_sampler
+
+__all__ = [
+    'EdgeBuffer', 'PioEdgeDecoder', 'PioEdgeCapture', 'create_pio_capture',
+    'Debouncer', 'PRESSED', 'RELEASED', 'VerticalCounter', 'LaneInputs',
+    'GpioInRegister', 'PinSnapshot', 'FakeGpioRegister', 'create_gpio_source',
+    'TimerSampler', 'create_timer_sampler'
+]
@@ -0,0 +1,41 @@
+# Time-based input debouncing for Raspberry Pi Pico Drag Race Controller
+# Debouncers never sleep: each raw sample is fed in with its timestamp and an edge
+# is reported once the input has settled
+
+PRESSED = 1     # update() result when the input becomes active
+RELEASED = -1   # update() result when the input becomes inactive
+
+class Debouncer:
+    def __init__(self, settle_us, initial=1, active_level=0):
+        """
+        Parameters:
+        settle_us (int): Settle time in microseconds
+        initial (int): Raw level the input starts at (1 = released with a pull-up)
+        active_level (int): Raw level that means pressed (0 for buttons to ground with pull-ups)
+        """
+        self.settle_us = settle_us
+        self.active_level = active_level
+        self.state = initial      # Debounced level
+        self.last_raw = initial   # Previous raw sample
+        self.changed_at = -settle_us  # When the raw level last changed
+        self.bounces = 0          # Raw edges rejected as contact bounce
+
+    def update(self, raw, now_us):
+        """Feed a raw sample taken at now_us; returns PRESSED, RELEASED or 0"""
+        last_raw = self.last_raw
+        self.last_raw = raw
+        
+        if raw != last_raw:
+            if last_raw != self.state:
+                # The previous change reverted before it settled
+                self.bounces += 1
+            self.changed_at = now_us
+            return 0
+        if raw != self.state and now_us - self.changed_at >= self.settle_us:
+            self.state = raw
+            return PRESSED if raw == self.active_level else RELEASED
+        return 0
+
+    def is_pressed(self):
+        """Return True when the debounced input is active"""
+        return self.state == self.active_level
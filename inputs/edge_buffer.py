@@ -0,0 +1,66 @@
+# Interrupt-driven edge capture for Raspberry Pi Pico Drag Race Controller
+# Pin IRQ handlers only record which pin fired and when; the main loop drains the events later
+import array
+import time
+
+class EdgeBuffer:
+    def __init__(self, size=64):
+        """
+        Create a preallocated ring buffer of timestamped pin edges
+
+        Parameters:
+        size (int): Number of slots in the ring (one slot is kept free to tell full from empty)
+        """
+        self.size = size
+        self.pins = array.array("B", bytes(size))           # GPIO number of each edge
+        self.stamps = array.array("I", [0 for _ in range(size)])  # time.ticks_us() of each edge
+        self.head = 0       # Next slot to write (only changed by push)
+        self.tail = 0       # Next slot to read (only changed by drain/clear)
+        self.overflows = 0  # Edges dropped because the buffer was full
+
+    def push(self, pin_id):
+        """Record an edge for pin_id - safe to call from a hard IRQ handler (no allocation)"""
+        stamp = time.ticks_us()
+        head = self.head
+        next_head = head + 1
+        if next_head == self.size:
+            next_head = 0
+        if next_head == self.tail:
+            self.overflows += 1
+            return
+        self.pins[head] = pin_id
+        self.stamps[head] = stamp
+        self.head = next_head
+
+    def attach(self, pin, pin_id, trigger):
+        """Register an IRQ on pin that pushes pin_id into this buffer"""
+        push = self.push  # Bind once so the handler does not allocate
+
+        def handler(_pin):
+            push(pin_id)
+
+        try:
+            pin.irq(handler=handler, trigger=trigger, hard=True)
+        except TypeError:
+            # Ports without hard IRQ support fall back to a soft IRQ
+            pin.irq(handler=handler, trigger=trigger)
+
+    def pending(self):
+        """Return the number of edges waiting to be drained"""
+        return (self.head - self.tail) % self.size
+
+    def drain(self, callback):
+        """Call callback(pin_id, stamp_us) for every pending edge in capture order (64-bit stamps)"""
+        # Imported here so the inputs package stays importable on Linux
+        from timing.timebase import from_ticks_us
+        count = 0
+        while self.tail != self.head:
+            i = self.tail
+            callback(self.pins[i], from_ticks_us(self.stamps[i]))
+            self.tail = (i + 1) % self.size
+            count += 1
+        return count
+
+    def clear(self):
+        """Discard all pending edges"""
+        self.tail = self.head
@@ -0,0 +1,65 @@
+# Single-register GPIO snapshots for Raspberry Pi Pico Drag Race Controller
+# Reading the SIO GPIO_IN register returns the level of every GPIO at the same instant,
+# so sampling all lanes costs one memory read no matter how many lanes are wired
+try:
+    import machine
+    MEM32_AVAILABLE = hasattr(machine, 'mem32')
+except ImportError:
+    MEM32_AVAILABLE = False
+
+SIO_BASE = 0xd0000000
+GPIO_IN = SIO_BASE + 0x004  # Input levels of GPIO0-29, bit n = GPIO n
+GPIO_MASK = 0x3fffffff
+
+class GpioInRegister:
+    """Reads all GPIO input levels from the RP2040 SIO GPIO_IN register"""
+    def __init__(self):
+        self.mem32 = machine.mem32
+
+    def read(self):
+        """Return the input level of every GPIO as a bitmask"""
+        return self.mem32[GPIO_IN] & GPIO_MASK
+
+class PinSnapshot:
+    def __init__(self, pins):
+        """
+        Fallback source that builds the bitmask from individual Pin.value() calls
+
+        Parameters:
+        pins (list): (Pin, bit) pairs to read
+        """
+        self.pins = pins
+
+    def read(self):
+        """Return the levels of the configured pins as a bitmask"""
+        raw = 0
+        for pin, bit in self.pins:
+            if pin.value():
+                raw |= bit
+        return raw
+
+class FakeGpioRegister:
+    """Stand-in register for running the input layer on Linux"""
+    def __init__(self, value=0):
+        self.value = value
+        self.reads = 0
+
+    def set_pin(self, gpio, level):
+        """Drive one fake GPIO high (1) or low (0)"""
+        if level:
+            self.value |= 1 << gpio
+        else:
+            self.value &= ~(1 << gpio)
+
+    def read(self):
+        """Return the fake register value"""
+        self.reads += 1
+        return self.value & GPIO_MASK
+
+def create_gpio_source(pins, mode="register"):
+    """Return a GPIO_IN register source, or a PinSnapshot over pins when the register can't be read"""
+    if mode == "register":
+        if MEM32_AVAILABLE:
+            return GpioInRegister()
+        print("GPIO snapshot: machine.mem32 not available, reading pins individually")
+    return PinSnapshot(pins)
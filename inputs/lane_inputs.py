@@ -0,0 +1,84 @@
+# Bitmask sampling of lane inputs for Raspberry Pi Pico Drag Race Controller
+# Every polled lane input (start/finish sensors and player buttons) is read into one
+# integer with bit n = GPIO n, then filtered in a single pass by a vertical counter
+from inputs.vertical_counter import VerticalCounter
+from inputs.gpio_snapshot import create_gpio_source
+
+class LaneInputs:
+    def __init__(self, lanes, samples=3, source=None, read_mode="register"):
+        """
+        Collect the polled inputs of every lane into one filtered bitmask
+
+        Sensor pins of simulated lanes and of lanes captured by IRQ/PIO are left out.
+        Filtered bits are active-high: 1 means beam blocked or button pressed.
+
+        Parameters:
+        lanes (list): Lane objects
+        samples (int): Minimum pulse width in samples before an input change is accepted
+        source (object, optional): Object whose read() returns all GPIO levels as a bitmask
+                                   (e.g. FakeGpioRegister on Linux); created from read_mode when omitted
+        read_mode (str): "register" for one GPIO_IN snapshot per sample, "pins" for Pin.value() calls
+        """
+        self.pins = []      # (Pin, bit) pairs, used when the register can't be read
+        self.invert = 0     # Bits that are active-low on the pin
+        self.mask = 0       # All sampled bits
+        for lane in lanes:
+            if not lane.use_simulation and not lane.edge_capture:
+                self._add(lane.start_pin, lane.start_mask, lane.digital_blocked_state == 0)
+                self._add(lane.finish_pin, lane.finish_mask, lane.digital_blocked_state == 0)
+            if lane.player_btn is not None:
+                # Player buttons pull the pin LOW when pressed
+                self._add(lane.player_btn, lane.button_mask, True)
+
+        if source is None:
+            source = create_gpio_source(self.pins, read_mode)
+        self.source = source
+
+        self.filter = VerticalCounter(samples)
+        # Sample times of the last `samples` samples: a change accepted now started
+        # at the oldest of them, which is when it was first seen
+        self.stamps = [0] * self.filter.samples
+        self.index = 0
+        self.edge_time = 0  # Time of the first sample of the most recent accepted change
+
+    def _add(self, pin, bit, active_low):
+        self.pins.append((pin, bit))
+        self.mask |= bit
+        if active_low:
+            self.invert |= bit
+
+    def read(self):
+        """Return the raw levels of the sampled inputs as a bitmask (one coherent snapshot)"""
+        return self.source.read() & self.mask
+
+    def sample(self, now_us):
+        """Take one sample at now_us; returns the bits whose filtered state changed"""
+        return self.update(self.source.read(), now_us)
+
+    def update(self, raw, now_us):
+        """Filter one raw GPIO bitmask taken at now_us; returns the bits whose filtered state changed"""
+        stamps = self.stamps
+        index = self.index
+        stamps[index] = now_us
+        index += 1
+        if index == len(stamps):
+            index = 0
+        self.index = index
+        toggled = self.filter.update((raw & self.mask) ^ self.invert)
+        if toggled:
+            # After the write above, the next slot holds the oldest sample of the run
+            self.edge_time = stamps[index]
+        return toggled
+
+    @property
+    def state(self):
+        """Filtered active-high bitmask"""
+        return self.filter.state
+
+    def glitches(self, bit):
+        """Return how many pulses shorter than the minimum width were rejected on bit"""
+        gpio = 0
+        while bit > 1:
+            bit >>= 1
+            gpio += 1
+        return self.filter.glitches[gpio]
@@ -0,0 +1,189 @@
+# PIO-based hardware timestamping of lane sensor edges
+# One PIO1 state machine per lane samples the lane's start/finish pin pair and pushes
+# every change together with a free-running sample counter into its RX FIFO.
+# The decoder below is plain Python so it can be exercised on Linux with synthetic FIFO words.
+try:
+    import rp2
+    import machine
+    PIO_AVAILABLE = True
+except ImportError:
+    PIO_AVAILABLE = False
+
+SAMPLE_CYCLES = 15          # PIO cycles per pass of the edge_capture loop (both paths are padded to match)
+SAMPLE_FLAG = 0x80000000    # Set in sample words, clear in counter words
+PIN_MASK = 0x3              # Sample words carry the start pin in bit 0 and the finish pin in bit 1
+COUNT_BITS = 31             # Counter words carry the low 31 bits of the down-counter
+COUNT_PERIOD = 1 << COUNT_BITS
+COUNT_MASK = COUNT_PERIOD - 1
+
+PIO1_BASE = 0x50300000      # PIO1 register block (CTRL is at offset 0)
+SM_ENABLE_MASK = 0xF        # CTRL bits 0-3: state machine enables (bits 8-11 restart their clock dividers)
+
+if PIO_AVAILABLE:
+    @rp2.asm_pio(in_shiftdir=rp2.PIO.SHIFT_LEFT, fifo_join=rp2.PIO.JOIN_RX)
+    def edge_capture():
+        """PIO program: y = previous pin sample, osr = free-running down-counter"""
+        wrap_target()
+        mov(isr, null)
+        in_(pins, 2)                    # isr = current start/finish sample
+        mov(x, isr)
+        jmp(x_not_y, "edge")
+        nop()                   [7]     # Pad to the length of the edge path
+        label("tick")
+        mov(x, osr)
+        jmp(x_dec, "store")             # One count per sample pass
+        label("store")
+        mov(osr, x)
+        wrap()
+        label("edge")
+        mov(y, x)                       # Remember the new sample
+        mov(isr, invert(null))
+        in_(y, 2)                       # Sample word: flag bits set, pins in bits 0-1
+        push(noblock)
+        mov(isr, null)
+        in_(osr, 31)                    # Counter word: bit 31 clear
+        push(noblock)
+        jmp("tick")
+
+class PioEdgeDecoder:
+    def __init__(self, start_gpio, finish_gpio, sm_freq, t0_us):
+        """
+        Decode FIFO words from one edge_capture state machine into timestamped edges
+
+        Parameters:
+        start_gpio (int): GPIO number reported for bit 0 of the sample
+        finish_gpio (int): GPIO number reported for bit 1 of the sample
+        sm_freq (int): State machine clock in Hz
+        t0_us (int): 64-bit microsecond time at which the state machine was enabled
+        """
+        self.pin_ids = (start_gpio, finish_gpio)
+        self.sm_freq = sm_freq
+        self.t0_us = t0_us
+        self.last_sample = 0
+        self.pending_sample = None
+        self.desyncs = 0  # Words that did not form a sample/counter pair (FIFO overflow)
+
+    def sample_to_us(self, sample_count):
+        """Convert a sample count since t0 into the 64-bit microsecond timebase"""
+        return self.t0_us + sample_count * SAMPLE_CYCLES * 1000000 // self.sm_freq
+
+    def unwrap(self, count_word, host_now_us):
+        """Return the full sample count for a 31-bit counter word, using the host clock to resolve wraps"""
+        count = (-count_word) & COUNT_MASK  # The PIO counts down from zero
+        expected = (host_now_us - self.t0_us) * self.sm_freq // (SAMPLE_CYCLES * 1000000)
+        wraps = (expected - count + COUNT_PERIOD // 2) // COUNT_PERIOD
+        if wraps < 0:
+            wraps = 0
+        return count + wraps * COUNT_PERIOD
+
+    def feed(self, word, host_now_us, callback):
+        """Feed one FIFO word; calls callback(gpio, stamp_us) for each beam break it completes"""
+        if word & SAMPLE_FLAG:
+            if self.pending_sample is not None:
+                self.desyncs += 1
+            self.pending_sample = word & PIN_MASK
+            return
+        if self.pending_sample is None:
+            self.desyncs += 1
+            return
+        sample = self.pending_sample
+        self.pending_sample = None
+        stamp = self.sample_to_us(self.unwrap(word, host_now_us))
+        # With pull-up resistors a broken beam reads HIGH, so beam breaks are rising bits
+        rising = sample & ~self.last_sample
+        self.last_sample = sample
+        if rising & 1:
+            callback(self.pin_ids[0], stamp)
+        if rising & 2:
+            callback(self.pin_ids[1], stamp)
+
+class PioEdgeCapture:
+    def __init__(self, lanes, sm_freq=15000000):
+        """
+        Start one edge_capture state machine on PIO1 for each eligible lane
+
+        A lane is eligible when it uses hardware sensors and its finish pin is
+        the GPIO directly after its start pin. Other lanes keep polling.
+        """
+        from timing.timebase import ticks_us64
+        self._ticks_us64 = ticks_us64
+        self.sm_freq = sm_freq
+        self.channels = []  # (state machine, decoder)
+
+        pio = rp2.PIO(1)
+        # State machines already running belong to someone else (e.g. the Pico W Wi-Fi driver)
+        in_use = machine.mem32[PIO1_BASE] & SM_ENABLE_MASK
+        free = [i for i in range(4) if not in_use & (1 << i)]
+        enable_mask = 0
+        pending = []
+        for lane in lanes:
+            if lane.use_simulation:
+                continue
+            if not free:
+                print(f"Lane {lane.lane_id}: No free PIO1 state machine, polling sensors")
+                continue
+            if lane.finish_gpio != lane.start_gpio + 1:
+                print(f"Lane {lane.lane_id}: Sensor pins not adjacent, polling sensors")
+                continue
+            index = free.pop(0)
+            sm = pio.state_machine(index, edge_capture, freq=sm_freq, in_base=lane.start_pin)
+            sm.exec("mov(y, null)")
+            sm.exec("mov(osr, null)")
+            pending.append((sm, lane))
+            enable_mask |= 1 << index
+
+        # Enable all state machines on the same cycle with synchronised clock dividers,
+        # so every lane's counter shares one time origin. Read-modify-write keeps the
+        # other PIO1 state machines running.
+        ctrl = machine.mem32[PIO1_BASE] & SM_ENABLE_MASK
+        machine.mem32[PIO1_BASE] = ctrl | enable_mask | (enable_mask << 8)
+        t0 = ticks_us64()
+
+        for sm, lane in pending:
+            self.channels.append((sm, PioEdgeDecoder(lane.start_gpio, lane.finish_gpio, sm_freq, t0)))
+            lane.edge_capture = True
+            print(f"Lane {lane.lane_id}: PIO capture enabled on GPIO{lane.start_gpio} and GPIO{lane.finish_gpio}")
+
+    def drain(self, callback):
+        """Call callback(gpio, stamp_us) for all captured beam breaks, oldest first"""
+        events = []
+        now = self._ticks_us64()
+        for sm, decoder in self.channels:
+            while sm.rx_fifo():
+                decoder.feed(sm.get(), now, lambda gpio, stamp: events.append((stamp, gpio)))
+        # Lanes are read one after another, so merge them back into capture order
+        events.sort()
+        for stamp, gpio in events:
+            callback(gpio, stamp)
+        return len(events)
+
+    def pending(self):
+        """Return the number of FIFO words waiting to be decoded"""
+        count = 0
+        for sm, _ in self.channels:
+            count += sm.rx_fifo()
+        return count
+
+    def clear(self):
+        """Discard all pending edges (decoders still track the current pin levels)"""
+        self.drain(lambda gpio, stamp: None)
+
+    @property
+    def desyncs(self):
+        """Total FIFO words dropped by the decoders"""
+        return sum(decoder.desyncs for _, decoder in self.channels)
+
+def create_pio_capture(lanes, sm_freq=15000000):
+    """Return a PioEdgeCapture, or None when PIO is unavailable so the caller keeps polling"""
+    if not PIO_AVAILABLE:
+        print("PIO capture: rp2 module not available, falling back to polling")
+        return None
+    try:
+        capture = PioEdgeCapture(lanes, sm_freq)
+    except Exception as e:
+        print(f"PIO capture: Failed to start ({e}), falling back to polling")
+        return None
+    if not capture.channels:
+        print("PIO capture: No eligible lanes, falling back to polling")
+        return None
+    return capture
@@ -0,0 +1,117 @@
+# Fixed-rate lane input sampling for Raspberry Pi Pico Drag Race Controller
+# A hardware timer snapshots the GPIO inputs at a constant rate into a preallocated ring,
+# so the sampling interval no longer depends on how long a main loop pass takes
+import array
+import time
+try:
+    from machine import Timer
+    TIMER_AVAILABLE = True
+except ImportError:
+    TIMER_AVAILABLE = False
+
+class TimerSampler:
+    def __init__(self, source, rate_hz=10000, size=256):
+        """
+        Create the sample ring (the timer is started by start())
+
+        Parameters:
+        source (object): Object whose read() returns all GPIO levels as a bitmask
+        rate_hz (int): Samples per second
+        size (int): Number of slots in the ring (one slot is kept free to tell full from empty)
+        """
+        self.source = source
+        self.rate_hz = rate_hz
+        self.period_us = 1000000 // rate_hz
+        self.size = size
+        self.samples = array.array("I", [0 for _ in range(size)])  # Raw GPIO bitmask of each sample
+        self.stamps = array.array("I", [0 for _ in range(size)])   # time.ticks_us() of each sample
+        self.head = 0       # Next slot to write (only changed by the timer callback)
+        self.tail = 0       # Next slot to read (only changed by drain/clear)
+        self.last_stamp = None
+        self.overruns = 0   # Timer callbacks that ran more than half a period late
+        self.dropped = 0    # Samples lost because the ring was full
+        self.max_backlog = 0  # Most samples waiting at one drain
+        self.timer = None
+        self._read = source.read  # Bind once so the callback does not allocate
+
+    def _tick(self, _timer):
+        """Timer callback: store one sample - safe in a hard IRQ (no allocation)"""
+        stamp = time.ticks_us()
+        last = self.last_stamp
+        if last is not None and time.ticks_diff(stamp, last) > self.period_us + (self.period_us >> 1):
+            self.overruns += 1
+        self.last_stamp = stamp
+        head = self.head
+        next_head = head + 1
+        if next_head == self.size:
+            next_head = 0
+        if next_head == self.tail:
+            self.dropped += 1
+            return
+        self.samples[head] = self._read()
+        self.stamps[head] = stamp
+        self.head = next_head
+
+    def start(self):
+        """Start sampling at rate_hz"""
+        tick = self._tick
+        self.timer = Timer()
+        try:
+            self.timer.init(mode=Timer.PERIODIC, freq=self.rate_hz, callback=tick, hard=True)
+        except TypeError:
+            # Ports without hard timer callbacks fall back to a soft callback
+            self.timer.init(mode=Timer.PERIODIC, freq=self.rate_hz, callback=tick)
+
+    def stop(self):
+        """Stop the sampling timer"""
+        if self.timer is not None:
+            self.timer.deinit()
+            self.timer = None
+
+    def pending(self):
+        """Return the number of samples waiting to be drained"""
+        return (self.head - self.tail) % self.size
+
+    def drain(self, callback):
+        """Call callback(raw_mask, stamp_us) for every buffered sample, oldest first (64-bit stamps)"""
+        # Imported here so the inputs package stays importable on Linux
+        from timing.timebase import from_ticks_us
+        backlog = self.pending()
+        if backlog > self.max_backlog:
+            self.max_backlog = backlog
+        count = 0
+        while self.tail != self.head:
+            i = self.tail
+            callback(self.samples[i], from_ticks_us(self.stamps[i]))
+            self.tail = (i + 1) % self.size
+            count += 1
+        return count
+
+    def clear(self):
+        """Discard all buffered samples"""
+        self.tail = self.head
+
+    def get_stats(self):
+        """Return sampler counters for diagnostics"""
+        return {
+            'rate_hz': self.rate_hz,
+            'overruns': self.overruns,
+            'dropped': self.dropped,
+            'max_backlog': self.max_backlog
+        }
+
+def create_timer_sampler(source, rate_hz, size=256):
+    """Return a running TimerSampler, or None when timers are unavailable so the caller samples per pass"""
+    if not rate_hz:
+        return None
+    if not TIMER_AVAILABLE:
+        print("Timer sampler: machine.Timer not available, sampling once per loop pass")
+        return None
+    sampler = TimerSampler(source, rate_hz, size)
+    try:
+        sampler.start()
+    except Exception as e:
+        print(f"Timer sampler: Failed to start ({e}), sampling once per loop pass")
+        return None
+    print(f"Timer sampler: Sampling lane inputs at {rate_hz} Hz")
+    return sampler
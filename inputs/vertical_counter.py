@@ -0,0 +1,66 @@
+# Bit-parallel "vertical counter" debouncer for Raspberry Pi Pico Drag Race Controller
+# Every input is one bit of an integer; each bit has its own sample counter stored
+# across a few bit-planes, so all inputs are filtered with a handful of bitwise
+# operations per sample no matter how many lanes there are
+import array
+
+class VerticalCounter:
+    def __init__(self, samples, initial=0):
+        """
+        Parameters:
+        samples (int): Minimum pulse width - an input must differ from its filtered state
+                       for this many consecutive samples before it changes
+        initial (int): Initial filtered state bitmask
+        """
+        self.samples = max(1, samples)
+        self.state = initial
+        
+        # Enough bit-planes to count 0 .. samples-1
+        planes = 0
+        while (1 << planes) < self.samples:
+            planes += 1
+        self.planes = [0] * planes
+        self.target = self.samples - 1
+        
+        self.glitches = array.array("I", [0] * 32)  # Per-bit count of pulses shorter than samples
+
+    def update(self, sample):
+        """Feed one sample bitmask; returns the bits whose filtered state toggled"""
+        delta = sample ^ self.state
+        planes = self.planes
+        
+        pending = 0
+        for plane in planes:
+            pending |= plane
+        if not delta and not pending:
+            return 0  # Fast path: nothing changing
+        
+        # Bits that have now differed for `samples` consecutive samples
+        toggle = delta
+        target = self.target
+        for k in range(len(planes)):
+            if (target >> k) & 1:
+                toggle &= planes[k]
+            else:
+                toggle &= ~planes[k]
+        
+        # Count up where the input still differs, clear everywhere else
+        keep = delta & ~toggle
+        carry = delta
+        for k in range(len(planes)):
+            plane = planes[k]
+            planes[k] = (plane ^ carry) & keep
+            carry = plane & carry
+        
+        # Bits that were counting but went back before reaching the minimum width
+        glitched = pending & ~delta
+        if glitched:
+            bit = 0
+            while glitched:
+                if glitched & 1:
+                    self.glitches[bit] += 1
+                glitched >>= 1
+                bit += 1
+        
+        self.state ^= toggle
+        return toggle
@@ -1,9 +1,10 @@
 # Lane class for Raspberry Pi Pico Drag Race Controller
 # Updated to use digital pins with internal pull-up resistors only
 from machine import Pin, PWM
-import time
 import config
-from led.ws2812b import set_lane_light
+from led.ws2812b import set_tree_light
+from led.mapping import LIGHT_IDS
+from timing.timebase import ticks_us64, us_to_ms
 
 class Lane:
     def __init__(self, lane_id, start_pin, finish_pin, servo_pin=None, player_btn_pin=None, display_controller=None):
@@ -34,13 +35,19 @@ class Lane:
         # Initialize digital pins for start and finish sensors WITH pull-up resistors
         self.start_pin = Pin(start_pin, Pin.IN, Pin.PULL_UP)
         self.finish_pin = Pin(finish_pin, Pin.IN, Pin.PULL_UP)
+        self.start_gpio = start_pin    # GPIO numbers identify this lane's edges in the IRQ buffer
+        self.finish_gpio = finish_pin
+        self.start_mask = 1 << start_pin   # Bits of this lane's inputs in the sampled input bitmask
+        self.finish_mask = 1 << finish_pin
         print(f"Lane {lane_id}: Initialized digital sensors on GPIO{start_pin} and GPIO{finish_pin} with PULL_UP")
         
         # Initialize player button and servo
         if player_btn_pin is not None:
             self.player_btn = Pin(player_btn_pin, Pin.IN, Pin.PULL_UP)
+            self.button_mask = 1 << player_btn_pin
         else:
             self.player_btn = None
+            self.button_mask = 0
             
         if servo_pin is not None:
             self.servo = PWM(Pin(servo_pin))
@@ -56,9 +63,9 @@ class Lane:
         # - When beam is broken (phototransistor not conducting): reads HIGH (1)
         self.digital_blocked_state = 1  # HIGH (1) means blocked with pull-up configuration
         
-        # Last known sensor states
-        self.last_start_blocked = False
-        self.last_finish_blocked = False
+        # When True, beam breaks arrive through an edge capture source (IRQ or PIO) instead of
+        # the filtered input bitmask sampled by the race manager
+        self.edge_capture = False
         
         self.prestaged = False
         self.staged = False
@@ -74,9 +81,9 @@ class Lane:
             "red": 0
         }
         
-        # Race state variables
-        self.reaction_time = None
-        self.finish_time = None
+        # Race state variables (all times on the 64-bit microsecond timebase)
+        self.reaction_time_us = None
+        self.finish_time_us = None
         self.start_time = None
         self.false_start = False
         self.gate_released = False
@@ -94,23 +101,45 @@ class Lane:
             self.servo_closed_position = config.SERVO_CLOSED_POSITION
         
         # Simulation variables
-        self.player_pressed_time = None  # When the player button was pressed
+        self.player_pressed_time = None  # When the player button was pressed (us)
         self.start_sim_scheduled = False # Whether a start beam break is scheduled
         self.finish_sim_scheduled = False # Whether a finish beam break is scheduled
         
         # Non-blocking servo control variables
-        self.servo_close_time = 0       # When to close the servo
+        self.servo_close_time = 0       # When to close the servo (us)
         self.servo_closing_pending = False  # Whether the servo needs to be closed
         
         # Debug variables
         self.debug_mode = False  # Set to True to enable debug printing
 
+    @property
+    def reaction_time(self):
+        """Reaction time in milliseconds, rounded from the microsecond measurement"""
+        return us_to_ms(self.reaction_time_us)
+
+    @property
+    def finish_time(self):
+        """Finish time in milliseconds, rounded from the microsecond measurement"""
+        return us_to_ms(self.finish_time_us)
+
+    def attach_edge_buffer(self, edge_buffer):
+        """Capture start/finish beam breaks with pin IRQs that write into edge_buffer"""
+        if self.use_simulation:
+            return
+        # With pull-up resistors the pin goes HIGH when the beam is broken
+        trigger = Pin.IRQ_RISING if self.digital_blocked_state == 1 else Pin.IRQ_FALLING
+        edge_buffer.attach(self.start_pin, self.start_gpio, trigger)
+        edge_buffer.attach(self.finish_pin, self.finish_gpio, trigger)
+        self.edge_capture = True
+        print(f"Lane {self.lane_id}: IRQ capture enabled on GPIO{self.start_gpio} and GPIO{self.finish_gpio}")
+
     def set_light(self, light_name, state):
         """Set a light in the tree to on (1) or off (0) and update the LED strip"""
-        if light_name in self.tree_state:
+        light_id = LIGHT_IDS.get(light_name)
+        if light_id is not None:
             self.tree_state[light_name] = state
             # Update the physical LED
-            set_lane_light(self.lane_id, light_name, state)
+            set_tree_light(self.lane_id, light_id, state)
 
     def get_light_state(self, light_name):
         """Get the current state of a light in the tree"""
@@ -124,26 +153,26 @@ class Lane:
             self.servo.duty_u16(self.servo_open_position)  # Open position
             
             # Schedule servo closing instead of blocking with sleep
-            self.servo_close_time = time.ticks_ms() + config.SERVO_HOLD_TIME
+            self.servo_close_time = ticks_us64() + config.SERVO_HOLD_TIME * 1000
             self.servo_closing_pending = True
             self.gate_released = True
             
             # In simulation mode, record when the player pressed the button
             if self.use_simulation:
-                self.player_pressed_time = time.ticks_ms()
+                self.player_pressed_time = ticks_us64()
                 self.start_sim_scheduled = True
     
     def update_servo(self):
         """Check if the servo needs to be closed (non-blocking)"""
-        if self.servo_closing_pending and self.servo is not None and time.ticks_diff(time.ticks_ms(), self.servo_close_time) >= 0:
+        if self.servo_closing_pending and self.servo is not None and ticks_us64() >= self.servo_close_time:
             print(f"  servo.duty_u16({self.servo_closed_position})")
             self.servo.duty_u16(self.servo_closed_position)  # Closed position
             self.servo_closing_pending = False
 
     def reset(self):
         """Reset the lane to its initial state"""
-        self.reaction_time = None
-        self.finish_time = None
+        self.reaction_time_us = None
+        self.finish_time_us = None
         self.start_time = None
         self.false_start = False
         self.gate_released = False
@@ -151,8 +180,6 @@ class Lane:
         self.start_beam_time = None
         self.finish_line_broken = False
         self.place = None
-        self.last_start_blocked = False
-        self.last_finish_blocked = False
         
         # Turn off all lights
         for light in self.tree_state:
@@ -181,35 +208,23 @@ class Lane:
         return self.finish_pin.value() == self.digital_blocked_state
 
     def check_start_line(self):
-        """Check if the start line has been crossed"""
+        """Simulate start line crossings (hardware sensors deliver edges to on_start_edge)"""
         # In simulation mode, check if it's time to simulate a start beam break
         if self.use_simulation and self.start_sim_scheduled and not self.start_line_broken:
-            current_time = time.ticks_ms()
+            current_time = ticks_us64()
             # Get the reaction time for this lane (default to first lane if index is out of bounds)
             sim_reaction_time = config.SIMULATION_REACTION_TIMES[self.lane_id-1] if self.lane_id <= len(config.SIMULATION_REACTION_TIMES) else config.SIMULATION_REACTION_TIMES[0]
             
             # Check if enough time has passed since the player button was pressed
-            if self.player_pressed_time and time.ticks_diff(current_time, self.player_pressed_time) >= sim_reaction_time:
+            if self.player_pressed_time and current_time - self.player_pressed_time >= sim_reaction_time * 1000:
                 self._handle_start_beam_break(current_time)
                 self.start_sim_scheduled = False
                 self.finish_sim_scheduled = True  # Schedule finish beam break
-                return  # Early return after simulating start beam
-                
-            # Return early - in simulation mode, we don't check physical sensors
-            return
-        
-        # Only check physical sensors if NOT in simulation mode 
-        if not self.use_simulation:
-            # Regular start beam check with digital pin using pull-up
-            is_blocked = self.is_start_beam_blocked()
-            
-            # Detect transition from unblocked to blocked (beam break)
-            if not self.start_line_broken and is_blocked and not self.last_start_blocked:
-                # Car has broken the start beam
-                self._handle_start_beam_break(time.ticks_ms())
-            
-            # Update last known state
-            self.last_start_blocked = is_blocked
+
+    def on_start_edge(self, event_time):
+        """Handle a start beam break from the filtered input bitmask or an edge capture source"""
+        if not self.start_line_broken:
+            self._handle_start_beam_break(event_time)
 
     def _handle_start_beam_break(self, current_time):
         """Internal helper to handle start beam break logic"""
@@ -218,10 +233,10 @@ class Lane:
         
         print(f"Lane {self.lane_id}: {'Simulated ' if self.use_simulation else ''}start beam break")
             
-        # Check for false start if tree is running but green is not lit
-        from race_manager import race_manager  # Import here to avoid circular import
-        
-        if race_manager.tree_running and not self.get_light_state('green'):
+        # Judge the start from the edge's own timestamp: edges can be handled after green
+        # was lit (input filter, capture buffers), so the light state at handling time
+        # says nothing about when the beam broke
+        if self.start_time is None or current_time < self.start_time:
             self.false_start = True
             self.set_light('red', 1)  # Turn on red light
             print(f"Lane {self.lane_id}: RED LIGHT! False start detected.")
@@ -230,44 +245,32 @@ class Lane:
             if self.display_controller:
                 self.display_controller.show_false_start(self.lane_id - 1)
                 
-        # Calculate reaction time for valid starts (green light is on)
-        elif self.start_time is not None:
-            self.reaction_time = time.ticks_diff(current_time, self.start_time)
-            print(f"Lane {self.lane_id}: Reaction {self.reaction_time} ms")
+        # Calculate reaction time for valid starts (beam broke at or after green lit)
+        else:
+            self.reaction_time_us = current_time - self.start_time
+            print(f"Lane {self.lane_id}: Reaction {self.reaction_time_us} us")
             
             # Update the reaction time display if available
             if self.display_controller:
                 self.display_controller.show_reaction_time(self.lane_id - 1, self.reaction_time)
 
     def check_finish(self):
-        """Check if the finish line has been crossed"""
+        """Simulate finish line crossings (hardware sensors deliver edges to on_finish_edge)"""
         # In simulation mode, check if it's time to simulate a finish beam break
         if self.use_simulation and self.finish_sim_scheduled and not self.finish_line_broken:
-            current_time = time.ticks_ms()
+            current_time = ticks_us64()
             # Get the race time for this lane (default to first lane if index is out of bounds)
             sim_race_time = config.SIMULATION_RACE_TIMES[self.lane_id-1] if self.lane_id <= len(config.SIMULATION_RACE_TIMES) else config.SIMULATION_RACE_TIMES[0]
             
             # Check if enough time has passed since the start beam was broken
-            if self.start_beam_time and time.ticks_diff(current_time, self.start_beam_time) >= sim_race_time:
+            if self.start_beam_time and current_time - self.start_beam_time >= sim_race_time * 1000:
                 self._handle_finish_beam_break(current_time)
                 self.finish_sim_scheduled = False
-                return  # Early return after simulating finish beam
-                
-            # Return early - in simulation mode, we don't check physical sensors
-            return
-        
-        # Only check physical sensors if NOT in simulation mode
-        if not self.use_simulation:
-            # Regular finish beam check with digital pin
-            is_blocked = self.is_finish_beam_blocked()
-            
-            # Detect transition from unblocked to blocked (beam break)
-            if not self.finish_line_broken and is_blocked and not self.last_finish_blocked:
-                # Car has broken the finish beam
-                self._handle_finish_beam_break(time.ticks_ms())
-            
-            # Update last known state
-            self.last_finish_blocked = is_blocked
+
+    def on_finish_edge(self, event_time):
+        """Handle a finish beam break from the filtered input bitmask or an edge capture source"""
+        if not self.finish_line_broken:
+            self._handle_finish_beam_break(event_time)
 
     def _handle_finish_beam_break(self, current_time):
         """Internal helper to handle finish beam break logic"""
@@ -277,20 +280,20 @@ class Lane:
         
         # Only record finish time if we have a start time
         if self.start_time is not None:
-            self.finish_time = time.ticks_diff(current_time, self.start_time)
-            print(f"Lane {self.lane_id}: Finish {self.finish_time} ms")
+            self.finish_time_us = current_time - self.start_time
+            print(f"Lane {self.lane_id}: Finish {self.finish_time_us} us")
 
     def calculate_reaction_time(self):
         """Calculate reaction time for false starts at end of race"""
-        if self.false_start and self.reaction_time is None and self.start_beam_time is not None:
+        if self.false_start and self.reaction_time_us is None and self.start_beam_time is not None:
             # For false starts, calculate how early they jumped before the green light
             if self.start_time is not None:
                 # If start_time exists, calculate the reaction time
-                self.reaction_time = time.ticks_diff(self.start_beam_time, self.start_time)
+                self.reaction_time_us = self.start_beam_time - self.start_time
                 # Note: This will be negative for false starts (broken beam before green light)
             else:
                 # If race was aborted before green light, we can't calculate exact reaction time
-                self.reaction_time = -1  # Use -1 to indicate "before green light"
+                self.reaction_time_us = -1000  # Use -1 ms to indicate "before green light"
 
     def enable_debug_mode(self, enable=True):
         """Enable or disable debug output"""
@@ -1,8 +1,44 @@
 # LED package for Raspberry Pi Pico Drag Race Controller
 # This file makes the directory a package
 
-from led.ws2812b import init, pixels_show, pixels_set, pixels_fill, set_lane_light
-from led.animations import display_startup_sequence, win_animation, false_start_animation
+from led.ws2812b import (
+    Strip, 
+    init, 
+    get_strip, 
+    led_set, 
+    led_mask, 
+    led_set_mask, 
+    pixels_fill_range, 
+    pixels_show, 
+    pixels_flush, 
+    pixels_dirty, 
+    next_flush_deadline, 
+    frame_in_flight, 
+    frame_light_time, 
+    enable_recorder, 
+    disable_recorder, 
+    get_led_stats, 
+    pixels_set, 
+    pixels_fill, 
+    set_tree_light, 
+    set_lane_light, 
+    set_brightness, 
+    get_brightness
+)
+from led.recorder import FrameRecorder
+from led.animator import Animator, animator, play_blocking
+from led.keyframes import Effect, register_effect, get_effect, effect_frames, segment_addresses
+from led.animations import (
+    display_startup_sequence, 
+    startup_frames, 
+    startup_duration_ms, 
+    flash_steps, 
+    win_animation, 
+    false_start_animation, 
+    win_frames, 
+    false_start_frames, 
+    RESULT_ANIMATION_MS
+)
 from led.aux_lighting import (
     set_display_indicator, 
     set_lane_winner, 
@@ -13,8 +49,15 @@ from led.aux_lighting import (
 )
 
 __all__ = [
-    'init', 'pixels_show', 'pixels_set', 'pixels_fill', 'set_lane_light',
-    'display_startup_sequence', 'win_animation', 'false_start_animation',
+    'Strip', 'init', 'get_strip', 'led_set', 'led_mask', 'led_set_mask',
+    'pixels_fill_range', 'pixels_show', 'pixels_flush', 'pixels_dirty', 'next_flush_deadline',
+    'frame_in_flight', 'frame_light_time', 'enable_recorder',
+    'disable_recorder', 'get_led_stats', 'pixels_set', 'pixels_fill', 'set_tree_light', 'set_lane_light',
+    'set_brightness', 'get_brightness',
+    'FrameRecorder', 'Animator', 'animator', 'play_blocking',
+    'Effect', 'register_effect', 'get_effect', 'effect_frames', 'segment_addresses',
+    'display_startup_sequence', 'startup_frames', 'startup_duration_ms', 'flash_steps', 'win_animation', 'false_start_animation',
+    'win_frames', 'false_start_frames', 'RESULT_ANIMATION_MS',
     'set_display_indicator', 'set_lane_winner', 'set_false_start_indicator',
     'illuminate_sensors', 'illuminate_spacers', 'clear_all_aux_leds'
 ]
\ No newline at end of file
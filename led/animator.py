@@ -0,0 +1,82 @@
+# Non-blocking LED animation engine for Raspberry Pi Pico Drag Race Controller
+# An animation is a generator that sets pixels for one frame and then yields how many
+# milliseconds to wait before its next frame. The main loop advances every running
+# animation when its frame is due, so several lanes animate at once without sleeping.
+import time
+from led.ws2812b import pixels_flush
+from timing.timebase import ticks_us64
+
+class Animator:
+    def __init__(self):
+        self.active = []  # [key, generator, next frame time (64-bit us)]
+
+    def start(self, key, frames):
+        """Start the animation generator frames under key, replacing one already running with that key"""
+        self.cancel(key)
+        # Frame times are absolute so the total duration does not drift with loop timing
+        self.active.append([key, frames, ticks_us64()])
+
+    def cancel(self, key):
+        """Stop the animation running under key (its current frame stays on the strip)"""
+        for i in range(len(self.active)):
+            if self.active[i][0] == key:
+                self._close(self.active.pop(i)[1])
+                return
+
+    def cancel_all(self):
+        """Stop every animation immediately (e.g. on race reset)"""
+        active = self.active
+        self.active = []
+        for entry in active:
+            self._close(entry[1])
+
+    def _close(self, frames):
+        try:
+            frames.close()
+        except ValueError:
+            pass  # Being advanced by the other thread; it is already out of the active list
+
+    def busy(self, key=None):
+        """Return True if any animation (or the one under key) is running"""
+        if key is None:
+            return len(self.active) > 0
+        for entry in self.active:
+            if entry[0] == key:
+                return True
+        return False
+
+    def update(self):
+        """Advance every animation whose next frame is due"""
+        active = self.active
+        now = ticks_us64()
+        i = 0
+        while i < len(active):
+            entry = active[i]
+            if entry[2] <= now:
+                try:
+                    delay_ms = next(entry[1])
+                except StopIteration:
+                    active.pop(i)
+                    continue
+                if active is not self.active:
+                    return  # Cancelled while this frame was drawn
+                entry[2] += delay_ms * 1000
+            i += 1
+
+    def next_deadline(self):
+        """Return when the next frame is due (64-bit us), or None when nothing is animating"""
+        earliest = None
+        for entry in self.active:
+            if earliest is None or entry[2] < earliest:
+                earliest = entry[2]
+        return earliest
+
+def play_blocking(frames):
+    """Run an animation generator to completion, sleeping between frames"""
+    for delay_ms in frames:
+        pixels_flush(wait=True)
+        time.sleep_ms(delay_ms)
+    pixels_flush(wait=True)
+
+# Shared animator driven by the main loop
+animator = Animator()
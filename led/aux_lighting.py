@@ -1,30 +1,28 @@
 # Auxiliary lighting functions for additional LEDs
-import time
+# Static indicators only change the frame buffer; the main loop flushes it once per pass
 import config
-from led.ws2812b import pixels_set, pixels_show
+from led.ws2812b import led_set, led_mask, led_set_mask
+from led.mapping import lane_indicator_leds, display_indicator_led, AUX_SENSORS, AUX_SPACERS, AUX_ALL
+from led.animator import animator
+from led.keyframes import effect_frames
+
+# Fixed LED groups compiled once into per-strip bulk write masks
+SENSOR_MASK = led_mask(AUX_SENSORS)
+SPACER_MASK = led_mask(AUX_SPACERS)
+AUX_MASK = led_mask(AUX_ALL)
 
 def get_lane_indicator_leds(lane_id):
-    """Get all indicator LEDs for a specific lane"""
-    led_indices = []
-    
-    # Check for the three indicator LEDs
-    for i in range(1, 4):  # Looking for indicator1, indicator2, indicator3
-        led_name = f"lane{lane_id}_indicator{i}"
-        if led_name in config.AUX_LED_MAPPING:
-            led_indices.append(config.AUX_LED_MAPPING[led_name])
-    
-    return led_indices
+    """Get all indicator LEDs for a specific lane (precomputed table, do not modify)"""
+    return lane_indicator_leds(lane_id)
 
 def set_display_indicator(lane_id, color):
     """Set the display indicator LED for a lane"""
-    led_name = f"lane{lane_id}_display"
-    if led_name in config.AUX_LED_MAPPING:
-        led_index = config.AUX_LED_MAPPING[led_name]
-        pixels_set(led_index, color)
-        pixels_show()
+    led_index = display_indicator_led(lane_id)
+    if led_index >= 0:
+        led_set(led_index, color)
 
 def set_lane_winner(lane_id, is_winner=True):
-    """Show winning animation for a lane using all three indicator LEDs"""
+    """Show winning animation for a lane using all three indicator LEDs (runs in the main loop)"""
     # Get all indicator LEDs for this lane
     led_indices = get_lane_indicator_leds(lane_id)
     
@@ -34,23 +32,12 @@ def set_lane_winner(lane_id, is_winner=True):
     
     if is_winner:
         # Blink green on all the indicator LEDs
-        for _ in range(5):
-            # Turn on all indicators
-            for led_index in led_indices:
-                pixels_set(led_index, config.GREEN)
-            pixels_show()
-            time.sleep_ms(200)
-            
-            # Turn off all indicators
-            for led_index in led_indices:
-                pixels_set(led_index, config.BLACK)
-            pixels_show()
-            time.sleep_ms(200)
+        animator.start(("winner", lane_id), effect_frames("winner", lane_id))
     else:
+        animator.cancel(("winner", lane_id))
         # Turn off all indicator LEDs
         for led_index in led_indices:
-            pixels_set(led_index, config.BLACK)
-        pixels_show()
+            led_set(led_index, config.BLACK)
 
 def set_false_start_indicator(lane_id, state=True):
     """Set the false start indicator for a lane using all three indicator LEDs"""
@@ -64,24 +51,18 @@ def set_false_start_indicator(lane_id, state=True):
     if state:
         # Set all indicators to red
         for led_index in led_indices:
-            pixels_set(led_index, config.RED)
+            led_set(led_index, config.RED)
     else:
         # Turn off all indicators
         for led_index in led_indices:
-            pixels_set(led_index, config.BLACK)
-    
-    pixels_show()
+            led_set(led_index, config.BLACK)
 
 def illuminate_sensors(state=True):
     """Turn on/off LEDs for sensor illumination"""
     color = config.WHITE if state else config.BLACK
     
     # Set all sensor illumination LEDs
-    for led_name, led_index in config.AUX_LED_MAPPING.items():
-        if "sensor" in led_name:
-            pixels_set(led_index, color)
-    
-    pixels_show()
+    led_set_mask(SENSOR_MASK, color)
 
 def illuminate_spacers(color=None):
     """Set spacer LEDs to a specific color or turn them off"""
@@ -89,14 +70,8 @@ def illuminate_spacers(color=None):
         color = config.BLACK
     
     # Set all spacer LEDs
-    for led_name, led_index in config.AUX_LED_MAPPING.items():
-        if "spacer" in led_name:
-            pixels_set(led_index, color)
-    
-    pixels_show()
+    led_set_mask(SPACER_MASK, color)
 
 def clear_all_aux_leds():
     """Turn off all auxiliary LEDs"""
-    for _, led_index in config.AUX_LED_MAPPING.items():
-        pixels_set(led_index, config.BLACK)
-    pixels_show()
\ No newline at end of file
+    led_set_mask(AUX_MASK, config.BLACK)
\ No newline at end of file
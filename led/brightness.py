@@ -0,0 +1,56 @@
+# Gamma-corrected LED brightness for Raspberry Pi Pico Drag Race Controller
+# Each LED group has a 256-entry lookup table mapping a color channel to its output
+# level; the tables are applied when a frame is flushed, so config colors stay full intensity
+import config
+from led.mapping import STRIP_LEDS, ADDR_SHIFT, ADDR_MASK, AUX_DISPLAY, AUX_INDICATORS, AUX_SENSORS, AUX_SPACERS
+
+GROUP_NAMES = ("tree", "indicators", "sensors")
+GROUP_TREE, GROUP_INDICATORS, GROUP_SENSORS = range(len(GROUP_NAMES))
+
+gamma = getattr(config, 'LED_GAMMA', 2.2)
+levels = bytearray(len(GROUP_NAMES))                 # Brightness of each group (0-255)
+luts = [bytearray(256) for _ in GROUP_NAMES]         # Channel value -> output value, per group
+
+# Group of every LED on each strip (tree lights and unmapped LEDs use the tree group)
+strip_groups = [bytearray(count) for count in STRIP_LEDS]
+
+def _assign(address, group):
+    strip_groups[address >> ADDR_SHIFT][address & ADDR_MASK] = group
+
+for _address in AUX_DISPLAY:
+    if _address >= 0:
+        _assign(_address, GROUP_INDICATORS)
+for _leds in AUX_INDICATORS:
+    for _address in _leds:
+        _assign(_address, GROUP_INDICATORS)
+for _address in AUX_SPACERS:
+    _assign(_address, GROUP_INDICATORS)
+for _address in AUX_SENSORS:
+    _assign(_address, GROUP_SENSORS)
+
+def group_id(name):
+    """Return the id of a group name, or None if unknown"""
+    for i in range(len(GROUP_NAMES)):
+        if GROUP_NAMES[i] == name:
+            return i
+    return None
+
+def set_level(group, level):
+    """Rebuild a group's lookup table for brightness level (0-255) with gamma correction"""
+    level = max(0, min(255, int(level)))
+    levels[group] = level
+    lut = luts[group]
+    scale = level / 255
+    for v in range(256):
+        lut[v] = int(255 * ((v / 255) * scale) ** gamma + 0.5)
+
+def get_levels():
+    """Return the brightness level of every group by name"""
+    result = {}
+    for i in range(len(GROUP_NAMES)):
+        result[GROUP_NAMES[i]] = levels[i]
+    return result
+
+_configured = getattr(config, 'LED_BRIGHTNESS', {})
+for _i in range(len(GROUP_NAMES)):
+    set_level(_i, _configured.get(GROUP_NAMES[_i], 255))
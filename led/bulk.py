@@ -0,0 +1,68 @@
+# Bulk LED buffer operations for Raspberry Pi Pico Drag Race Controller
+# Fill, copy and mask writes over array("I") frame buffers. On MicroPython these are
+# viper loops over raw pointers; elsewhere they fall back to slice assignment.
+import array
+
+try:
+    import micropython
+
+    @micropython.viper
+    def fill_words(buf, start: int, end: int, color: int):
+        """Set buf[start:end] to color"""
+        p = ptr32(buf)
+        i = start
+        while i < end:
+            p[i] = color
+            i += 1
+
+    @micropython.viper
+    def copy_words(dst, dst_start: int, src, src_start: int, count: int):
+        """Copy count words from src[src_start:] to dst[dst_start:]"""
+        d = ptr32(dst)
+        s = ptr32(src)
+        i = 0
+        while i < count:
+            d[dst_start + i] = s[src_start + i]
+            i += 1
+
+    @micropython.viper
+    def set_words(buf, indices, count: int, color: int):
+        """Set buf[indices[i]] to color for the first count entries of an array("H") of indices"""
+        p = ptr32(buf)
+        idx = ptr16(indices)
+        i = 0
+        while i < count:
+            p[idx[i]] = color
+            i += 1
+
+    VIPER_AVAILABLE = True
+except (ImportError, AttributeError, NameError, SyntaxError):
+    VIPER_AVAILABLE = False
+
+    def fill_words(buf, start, end, color):
+        """Set buf[start:end] to color"""
+        if end > start:
+            buf[start:end] = array.array("I", [color]) * (end - start)
+
+    def copy_words(dst, dst_start, src, src_start, count):
+        """Copy count words from src[src_start:] to dst[dst_start:]"""
+        dst[dst_start:dst_start + count] = src[src_start:src_start + count]
+
+    def set_words(buf, indices, count, color):
+        """Set buf[indices[i]] to color for the first count entries of an array("H") of indices"""
+        for i in range(count):
+            buf[indices[i]] = color
+
+class LedMask:
+    def __init__(self, strip_id, indices):
+        """
+        A fixed set of LEDs on one strip, written in one call by Strip.apply_mask()
+
+        Parameters:
+        strip_id (int): Strip the LEDs are on
+        indices (iterable): LED indices on that strip
+        """
+        self.strip_id = strip_id
+        self.indices = array.array("H", indices)
+        self.count = len(self.indices)
+        self.high = max(self.indices) + 1 if self.count else 0  # One past the highest index (for dirty tracking)
@@ -0,0 +1,179 @@
+# Declarative keyframe animations for Raspberry Pi Pico Drag Race Controller
+# An effect is a list of steps (plain dicts and tuples). It is compiled once into a flat list
+# of frames, each a tuple of (LED masks, color) writes plus the delay before the next frame,
+# and played back by the animator without blocking.
+#
+# Steps:
+#   {"set": [(segment, color), ...], "ms": 200}
+#       Write the colors, then hold for ms
+#   {"fade": [(segment, from_color, to_color), ...], "ms": 500, "ease": "in", "frame_ms": 20}
+#       Interpolate over ms, one frame every frame_ms (ease: linear, in, out, inout, step)
+#   {"chase": (segment, color), "ms": 50}
+#       Light the segment's LEDs one at a time in address order, ms per LED
+#   {"repeat": 3, "steps": [...]}
+#       Play the nested steps several times
+#
+# Segments:
+#   "all"                       every LED on every strip
+#   "lane", "lane:N", "lanes"   tree LEDs of the effect's lane, of lane N, or of every lane
+#   "tree:<light>"              one tree light of the effect's lane ("tree:<light>:N", "tree:<light>:*")
+#   "indicators", "indicators:N", "sensors", "spacers", "aux"
+#   a list of LED addresses (-1 entries are skipped; addresses off the configured strips raise ValueError)
+#
+# Colors are ints (GRB) or names of config colors ("GREEN").
+import config
+from led.ws2812b import led_mask, led_set_mask
+from led.mapping import (STRIP_LEDS, ADDR_SHIFT, valid_address, LIGHT_IDS, MAX_LANE, LANE_LEDS, tree_led,
+                         lane_indicator_leds, AUX_SENSORS, AUX_SPACERS, AUX_ALL)
+
+FRAME_MS = 20  # Default fade frame interval
+
+EASING = {
+    "linear": lambda t: t,
+    "in": lambda t: t * t,
+    "out": lambda t: t * (2 - t),
+    "inout": lambda t: 2 * t * t if t < 0.5 else 1 - 2 * (1 - t) * (1 - t),
+    "step": lambda t: 1 if t >= 1 else 0,
+}
+
+def _lane_arg(spec, lane_id):
+    """Return the lane selected by the ":N" suffix of a segment, or the effect's lane"""
+    parts = spec.split(":")
+    return int(parts[-1]) if len(parts) > 1 and parts[-1].isdigit() else lane_id
+
+def segment_addresses(spec, lane_id=0):
+    """Resolve a segment spec into a list of LED addresses"""
+    if not isinstance(spec, str):
+        addresses = [address for address in spec if address >= 0]
+        for address in addresses:
+            if not valid_address(address):
+                raise ValueError(f"LED address {address} is not on a configured strip")
+        return addresses
+    name = spec.split(":")[0]
+    if name == "all":
+        return [(strip << ADDR_SHIFT) | i for strip in range(len(STRIP_LEDS)) for i in range(STRIP_LEDS[strip])]
+    if name == "lanes":
+        return [address for lane in range(1, MAX_LANE + 1) for address in LANE_LEDS[lane]]
+    if name == "lane":
+        lane = _lane_arg(spec, lane_id)
+        return list(LANE_LEDS[lane]) if 0 < lane <= MAX_LANE else []
+    if name == "tree":
+        parts = spec.split(":")
+        light = LIGHT_IDS[parts[1]]
+        if len(parts) > 2 and parts[2] == "*":
+            lanes = range(1, MAX_LANE + 1)
+        else:
+            lanes = (_lane_arg(spec, lane_id),)
+        return [address for address in (tree_led(lane, light) for lane in lanes) if address >= 0]
+    if name == "indicators":
+        return list(lane_indicator_leds(_lane_arg(spec, lane_id)))
+    if name == "sensors":
+        return list(AUX_SENSORS)
+    if name == "spacers":
+        return list(AUX_SPACERS)
+    if name == "aux":
+        return list(AUX_ALL)
+    raise ValueError(f"Unknown LED segment {spec!r}")
+
+def _color(value):
+    """Return a GRB color int for an int or a config color name"""
+    if isinstance(value, str):
+        return getattr(config, value)
+    return value
+
+def _blend(start, end, amount):
+    """Mix two GRB colors channel by channel (amount 0.0-1.0)"""
+    color = 0
+    for shift in (16, 8, 0):
+        a = (start >> shift) & 0xFF
+        b = (end >> shift) & 0xFF
+        color |= int(a + (b - a) * amount + 0.5) << shift
+    return color
+
+class Effect:
+    def __init__(self, steps, lane_id=0):
+        """
+        Compile a list of keyframe steps into frames
+
+        Parameters:
+        steps (list): Step definitions (see the top of this module)
+        lane_id (int): Lane used by segments that do not name one
+        """
+        self.lane_id = lane_id
+        self.frames = []      # (((masks, color), ...), delay_ms)
+        self.duration_ms = 0
+        self._masks = {}      # Segment spec -> compiled masks, shared by every frame
+        self._compile(steps)
+
+    def _mask(self, spec):
+        key = spec if isinstance(spec, str) else tuple(spec)
+        masks = self._masks.get(key)
+        if masks is None:
+            masks = led_mask(segment_addresses(spec, self.lane_id))
+            self._masks[key] = masks
+        return masks
+
+    def _frame(self, ops, delay_ms):
+        """Append a frame; writes of a zero-delay frame are merged into the next one"""
+        ops = tuple(op for op in ops if op[0])
+        if self.frames and self.frames[-1][1] == 0:
+            ops = self.frames.pop()[0] + ops
+        self.frames.append((ops, delay_ms))
+        self.duration_ms += delay_ms
+
+    def _compile(self, steps):
+        for step in steps:
+            ms = step.get("ms", 0)
+            if "repeat" in step:
+                for _ in range(step["repeat"]):
+                    self._compile(step["steps"])
+            elif "set" in step:
+                self._frame([(self._mask(spec), _color(color)) for spec, color in step["set"]], ms)
+            elif "fade" in step:
+                ease = EASING[step.get("ease", "linear")]
+                frame_ms = step.get("frame_ms", FRAME_MS)
+                count = max(1, ms // frame_ms)
+                fades = [(self._mask(spec), _color(start), _color(end)) for spec, start, end in step["fade"]]
+                for n in range(1, count + 1):
+                    amount = ease(n / count)
+                    self._frame([(masks, _blend(start, end, amount)) for masks, start, end in fades],
+                                ms * n // count - ms * (n - 1) // count)
+            elif "chase" in step:
+                spec, color = step["chase"]
+                color = _color(color)
+                for address in sorted(segment_addresses(spec, self.lane_id)):
+                    self._frame([(led_mask((address,)), color)], ms)
+            else:
+                raise ValueError(f"Unknown keyframe step {step!r}")
+
+    def play(self):
+        """Animation generator for the animator (or play_blocking)"""
+        for ops, delay_ms in self.frames:
+            for masks, color in ops:
+                led_set_mask(masks, color)
+            yield delay_ms
+
+# Named effect definitions: a step list, or a function of lane_id returning one
+EFFECTS = {}
+_compiled = {}
+
+def register_effect(name, definition):
+    """Add or replace a named effect definition"""
+    EFFECTS[name] = definition
+    for key in [key for key in _compiled if key[0] == name]:
+        del _compiled[key]
+
+def get_effect(name, lane_id=0):
+    """Return the compiled Effect for a named definition (compiled once per lane)"""
+    key = (name, lane_id)
+    effect = _compiled.get(key)
+    if effect is None:
+        definition = EFFECTS[name]
+        steps = definition(lane_id) if callable(definition) else definition
+        effect = Effect(steps, lane_id)
+        _compiled[key] = effect
+    return effect
+
+def effect_frames(name, lane_id=0):
+    """Return an animation generator playing a named effect"""
+    return get_effect(name, lane_id).play()
@@ -0,0 +1,107 @@
+# Precomputed LED index tables for Raspberry Pi Pico Drag Race Controller
+# config.LED_MAPPING and config.AUX_LED_MAPPING are compiled once at import into flat
+# arrays, so a light change costs one array lookup instead of dict lookups and key building.
+# Entries are LED addresses: (strip id << ADDR_SHIFT) | index on that strip.
+import array
+import config
+
+# Strips in id order; a mapping entry is an index on the first strip or a (strip name, index) pair
+STRIPS = getattr(config, 'LED_STRIPS', [{"name": "main", "pin": config.WS2812B_PIN, "leds": config.NUM_LEDS}])
+STRIP_NAMES = [strip["name"] for strip in STRIPS]
+STRIP_LEDS = [strip["leds"] for strip in STRIPS]
+ADDR_SHIFT = 10
+ADDR_MASK = (1 << ADDR_SHIFT) - 1
+
+# Tree lights by id (the order matches the physical tree from top to bottom)
+LIGHT_NAMES = ("prestage", "stage", "amber1", "amber2", "amber3", "green", "red")
+NUM_LIGHTS = len(LIGHT_NAMES)
+LIGHT_IDS = {}
+for _i, _name in enumerate(LIGHT_NAMES):
+    LIGHT_IDS[_name] = _i
+PRESTAGE, STAGE, AMBER1, AMBER2, AMBER3, GREEN, RED = range(NUM_LIGHTS)
+
+def _address(entry):
+    """Return the LED address of a mapping entry, or -1 if it is not on a configured strip"""
+    strip = 0
+    index = entry
+    if isinstance(entry, (tuple, list)):
+        if entry[0] not in STRIP_NAMES:
+            return -1
+        strip = STRIP_NAMES.index(entry[0])
+        index = entry[1]
+    if 0 <= index < STRIP_LEDS[strip]:
+        return (strip << ADDR_SHIFT) | index
+    return -1
+
+def valid_address(address):
+    """Return True if address is an LED on a configured strip"""
+    strip = address >> ADDR_SHIFT
+    if address < 0 or strip >= len(STRIPS):
+        return False
+    return _address((STRIP_NAMES[strip], address & ADDR_MASK)) == address
+
+# LED address of each tree light: TREE_INDEX[lane_id * NUM_LIGHTS + light_id] (-1 = not mapped)
+MAX_LANE = max(config.LED_MAPPING) if config.LED_MAPPING else 0
+TREE_INDEX = array.array("h", [-1] * ((MAX_LANE + 1) * NUM_LIGHTS))
+LANE_LEDS = [array.array("h") for _ in range(MAX_LANE + 1)]  # All tree LEDs of each lane
+for _lane, _lights in config.LED_MAPPING.items():
+    for _name, _entry in _lights.items():
+        _index = _address(_entry)
+        if _name in LIGHT_IDS and _index >= 0:
+            TREE_INDEX[_lane * NUM_LIGHTS + LIGHT_IDS[_name]] = _index
+            LANE_LEDS[_lane].append(_index)
+
+# Color of each tree light when on, and the shared off color
+TREE_ON_COLOR = array.array("I", [config.TREE_COLORS.get(name, config.WHITE) for name in LIGHT_NAMES])
+TREE_OFF_COLOR = config.TREE_COLORS["off"]
+
+def tree_led(lane_id, light_id):
+    """Return the LED address of a lane's tree light, or -1 when it is not mapped"""
+    if 0 < lane_id <= MAX_LANE:
+        return TREE_INDEX[lane_id * NUM_LIGHTS + light_id]
+    return -1
+
+# Auxiliary LED groups
+AUX_MAPPING = getattr(config, 'AUX_LED_MAPPING', {})
+MAX_AUX_LANE = config.NUM_LANES
+AUX_DISPLAY = array.array("h", [-1] * (MAX_AUX_LANE + 1))                # LED above each lane's display
+AUX_INDICATORS = [array.array("h") for _ in range(MAX_AUX_LANE + 1)]     # Indicator LEDs of each lane
+AUX_SENSORS = array.array("h")  # Sensor illumination LEDs
+AUX_SPACERS = array.array("h")  # Spacer LEDs
+AUX_ALL = array.array("h")      # Every auxiliary LED
+
+def _lane_number(name):
+    """Return n for keys starting with "lane<n>_", else 0"""
+    if not name.startswith("lane"):
+        return 0
+    digits = name[4:].split("_")[0]
+    return int(digits) if digits.isdigit() else 0
+
+for _name in sorted(AUX_MAPPING):
+    _index = _address(AUX_MAPPING[_name])
+    if _index < 0:
+        continue
+    AUX_ALL.append(_index)
+    _lane = _lane_number(_name)
+    if 0 < _lane <= MAX_AUX_LANE and _name.endswith("_display"):
+        AUX_DISPLAY[_lane] = _index
+    elif 0 < _lane <= MAX_AUX_LANE and "_indicator" in _name:
+        AUX_INDICATORS[_lane].append(_index)
+    if "sensor" in _name:
+        AUX_SENSORS.append(_index)
+    if "spacer" in _name:
+        AUX_SPACERS.append(_index)
+
+_NO_LEDS = array.array("h")
+
+def lane_indicator_leds(lane_id):
+    """Return the indicator LED addresses of a lane (empty when it has none)"""
+    if 0 < lane_id <= MAX_AUX_LANE:
+        return AUX_INDICATORS[lane_id]
+    return _NO_LEDS
+
+def display_indicator_led(lane_id):
+    """Return the LED address above a lane's display, or -1"""
+    if 0 < lane_id <= MAX_AUX_LANE:
+        return AUX_DISPLAY[lane_id]
+    return -1
@@ -0,0 +1,86 @@
+# LED frame recorder for Raspberry Pi Pico Drag Race Controller
+# Logs every flushed frame with its handoff timestamp and the LEDs it changed into a
+# bounded ring, so tree timing can be checked from the log instead of filming the tree.
+# Plain Python: it also runs on Linux with a fake state machine (see ws2812b.init).
+import array
+
+class FrameRecorder:
+    def __init__(self, strip_leds, size=256, led_us=30, latch_us=280):
+        """
+        Parameters:
+        strip_leds (list): Number of LEDs on each strip, by strip id
+        size (int): Number of frames kept (older frames are overwritten)
+        led_us (int): Shift-out time per LED, used to report when a frame lit
+        latch_us (int): Calibrated end-of-data to light-on delay
+        """
+        self.size = size
+        self.led_us = led_us
+        self.latch_us = latch_us
+        self.frames = [None] * size  # (handoff_us, strip_id, LEDs sent, ((index, color), ...))
+        self.head = 0                # Next slot to write
+        self.count = 0
+        self.dropped = 0             # Frames overwritten before they were exported
+        self.shadow = [array.array("I", [0 for _ in range(n)]) for n in strip_leds]  # Colors as last sent
+
+    def record(self, strip_id, stamp_us, colors, count):
+        """Log a frame of count LEDs from colors (an array("I")) handed to the strip at stamp_us"""
+        shadow = self.shadow[strip_id]
+        changes = []
+        for i in range(count):
+            color = colors[i]
+            if shadow[i] != color:
+                shadow[i] = color
+                changes.append((i, color))
+        if self.count == self.size:
+            self.dropped += 1
+        else:
+            self.count += 1
+        self.frames[self.head] = (stamp_us, strip_id, count, tuple(changes))
+        self.head = (self.head + 1) % self.size
+
+    def entries(self):
+        """Return the recorded frames, oldest first"""
+        start = (self.head - self.count) % self.size
+        return [self.frames[(start + i) % self.size] for i in range(self.count)]
+
+    def lit_us(self, frame):
+        """Return when the LEDs showed a recorded frame"""
+        return frame[0] + frame[2] * self.led_us + self.latch_us
+
+    def changes_of(self, strip_id, index, color=None):
+        """Return the light-on times at which an LED changed (to color, if given), oldest first"""
+        times = []
+        for frame in self.entries():
+            if frame[1] != strip_id:
+                continue
+            for i, value in frame[3]:
+                if i == index and (color is None or value == color):
+                    times.append(self.lit_us(frame))
+        return times
+
+    def flush_rate(self):
+        """Return recorded frames per second over the recorded window (0 with fewer than two frames)"""
+        frames = self.entries()
+        if len(frames) < 2:
+            return 0
+        span = frames[-1][0] - frames[0][0]
+        return (len(frames) - 1) * 1000000 / span if span > 0 else 0
+
+    def clear(self):
+        """Discard the recorded frames (the shadow keeps the current colors)"""
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+
+    def export(self):
+        """Return the recorded frames as JSON-ready data"""
+        return {
+            'frames': [
+                {'t': frame[0], 'lit': self.lit_us(frame), 'strip': frame[1], 'leds': frame[2],
+                 'changes': [list(change) for change in frame[3]]}
+                for frame in self.entries()
+            ],
+            'dropped': self.dropped,
+            'size': self.size,
+            'flush_rate': self.flush_rate()
+        }
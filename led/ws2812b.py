@@ -1,57 +1,353 @@
 # WS2812B LED strip controller for Raspberry Pi Pico
-import array, time
-from machine import Pin
-import rp2
+# Each strip has its own pin, PIO0 state machine and frame buffer. Frames are handed to
+# DMA (or the PIO TX FIFO) and the caller returns at once; the strip's latch gap is only
+# waited for when another frame follows straight away
+import array
 import config
+try:
+    from machine import Pin
+    import rp2
+    PIO_AVAILABLE = True
+except ImportError:
+    PIO_AVAILABLE = False  # Linux: strips need a fake state machine (see init)
+from timing.timebase import ticks_us64
+from led.mapping import (
+    STRIPS, ADDR_SHIFT, ADDR_MASK, valid_address, LIGHT_IDS, NUM_LIGHTS, MAX_LANE,
+    TREE_INDEX, TREE_ON_COLOR, TREE_OFF_COLOR
+)
+from led import brightness
+from led.bulk import fill_words, copy_words, set_words, LedMask
+from led.recorder import FrameRecorder
 
-# State machine and LED array (global variables)
-led_sm = None
-led_array = None
-
-@rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True, pull_thresh=24)
-def ws2812():
-    """PIO assembly program for driving WS2812B LED strips"""
-    T1 = 2
-    T2 = 5
-    T3 = 3
-    wrap_target()
-    label("bitloop")
-    out(x, 1)               .side(0)    [T3 - 1]
-    jmp(not_x, "do_zero")   .side(1)    [T1 - 1]
-    jmp("bitloop")          .side(1)    [T2 - 1]
-    label("do_zero")
-    nop()                   .side(0)    [T2 - 1]
-    wrap()
-
-def init():
-    """Initialize the WS2812B LED controller"""
-    global led_sm, led_array
-    # Create the StateMachine
-    led_sm = rp2.StateMachine(0, ws2812, freq=8_000_000, sideset_base=Pin(config.WS2812B_PIN))
-    led_sm.active(1)
+LED_US = 30         # 24 bits at 800 kHz
+RESET_US = 300      # The strip latches a frame after the data line idles this long
+LATCH_US = getattr(config, 'LED_LATCH_US', 280)  # Calibrated end-of-data to light-on delay
+DREQ_PIO0_TX0 = 0   # DMA request line of PIO0 state machine 0's TX FIFO (state machine n is n)
+
+if PIO_AVAILABLE:
+    @rp2.asm_pio(sideset_init=rp2.PIO.OUT_LOW, out_shiftdir=rp2.PIO.SHIFT_LEFT, autopull=True, pull_thresh=24)
+    def ws2812():
+        """PIO assembly program for driving WS2812B LED strips"""
+        T1 = 2
+        T2 = 5
+        T3 = 3
+        wrap_target()
+        label("bitloop")
+        out(x, 1)               .side(0)    [T3 - 1]
+        jmp(not_x, "do_zero")   .side(1)    [T1 - 1]
+        jmp("bitloop")          .side(1)    [T2 - 1]
+        label("do_zero")
+        nop()                   .side(0)    [T2 - 1]
+        wrap()
+
+class Strip:
+    def __init__(self, strip_id, name, pin, num_leds, use_dma=True, sm=None):
+        """
+        One WS2812B chain with its own state machine and frame buffer
+
+        Parameters:
+        strip_id (int): Strip number, also the PIO0 state machine it uses (0-3)
+        name (str): Name used by LED mappings in config.py
+        pin (int): GPIO connected to the strip's data line
+        num_leds (int): Number of LEDs on the strip
+        use_dma (bool): Feed the state machine by DMA when the port supports it
+        sm (optional): State machine to use instead of a PIO0 one (e.g. a fake on Linux)
+        """
+        self.strip_id = strip_id
+        self.name = name
+        self.pin = pin
+        self.num_leds = num_leds
+        if sm is None:
+            sm = rp2.StateMachine(strip_id, ws2812, freq=8_000_000, sideset_base=Pin(pin))
+            sm.active(1)
+        else:
+            use_dma = False
+        self.sm = sm
+
+        self.array = array.array("I", [0 for _ in range(num_leds)])     # Colors as set (full intensity)
+        self.tx_array = array.array("I", [0 for _ in range(num_leds)])  # Output frame for put()
+        self.tx_view = memoryview(self.tx_array)                        # For sending partial frames
+        self.tx_bytes = bytearray(4 * num_leds)  # Output frame for DMA: little-endian words with GRB in the top 24 bits
+        self.groups = brightness.strip_groups[strip_id]
+
+        self.dma = None
+        self.dma_ctrl = 0
+        if use_dma and PIO_AVAILABLE and hasattr(rp2, 'DMA'):
+            try:
+                self.dma = rp2.DMA()
+                self.dma_ctrl = self.dma.pack_ctrl(size=2, inc_write=False, treq_sel=DREQ_PIO0_TX0 + strip_id)
+            except Exception as e:
+                print(f"WS2812B {name}: DMA unavailable ({e}), using PIO FIFO writes")
+                self.dma = None
+
+        # Frame buffer state: set()/fill() only mark the buffer dirty and flush() sends it,
+        # so many light changes go out as one frame
+        self.dirty_count = 0      # Number of LEDs from the start of the strip that need sending (0 = clean)
+        self.frame_end = 0        # 64-bit us time by which the last frame has been shifted out and latched
+        self.sent_at = 0          # 64-bit us time the last frame was handed to the PIO/DMA
+        self.sent_count = 0       # Number of LEDs in the last frame
+        self.frames_sent = 0
+        self.frames_deferred = 0  # Flushes postponed because a frame was still in flight
+
+    def set(self, i, color):
+        """Set one LED (sent by the next flush)"""
+        if 0 <= i < self.num_leds and self.array[i] != color:
+            self.array[i] = color
+            if i >= self.dirty_count:
+                self.dirty_count = i + 1
+
+    def fill(self, color):
+        """Set every LED on the strip (sent by the next flush)"""
+        fill_words(self.array, 0, self.num_leds, color)
+        self.dirty_count = self.num_leds
+
+    def fill_range(self, start, end, color):
+        """Set LEDs start..end-1 to color in one bulk write"""
+        if start < 0:
+            start = 0
+        if end > self.num_leds:
+            end = self.num_leds
+        if start < end:
+            fill_words(self.array, start, end, color)
+            if end > self.dirty_count:
+                self.dirty_count = end
+
+    def copy_segment(self, src, src_start, dst_start, count):
+        """Copy count colors from array("I") src[src_start:] onto this strip at dst_start"""
+        if dst_start < 0 or src_start < 0:
+            return
+        # Clamp to both ends: copy_words does not bounds-check in viper mode
+        if src_start + count > len(src):
+            count = len(src) - src_start
+        if dst_start + count > self.num_leds:
+            count = self.num_leds - dst_start
+        if count <= 0:
+            return
+        copy_words(self.array, dst_start, src, src_start, count)
+        if dst_start + count > self.dirty_count:
+            self.dirty_count = dst_start + count
+
+    def apply_mask(self, mask, color):
+        """Set every LED in an LedMask to color in one bulk write"""
+        set_words(self.array, mask.indices, mask.count, color)
+        if mask.high > self.dirty_count:
+            self.dirty_count = mask.high
+
+    def in_flight(self):
+        """Return True while the last frame is still being shifted out or latched"""
+        if self.dma is not None and self.dma.active():
+            return True
+        return ticks_us64() < self.frame_end
+
+    def flush(self, wait=False):
+        """Send the frame buffer if it changed; returns True when a frame was sent (see pixels_flush)"""
+        count = self.dirty_count
+        if not count:
+            return False
+        if self.in_flight():
+            if not wait:
+                self.frames_deferred += 1
+                return False
+            # Back-to-back frames: the strip must see the reset gap between them
+            while self.in_flight():
+                pass
+        self.dirty_count = 0
+        # LEDs past the highest changed index keep their colors, so the frame can stop there
+        buf = self.array
+        luts = brightness.luts
+        groups = self.groups
+        if self.dma is not None:
+            # Write bytes directly so no shifted 32-bit values are created
+            out = self.tx_bytes
+            j = 0
+            for i in range(count):
+                color = buf[i]
+                lut = luts[groups[i]]
+                out[j + 1] = lut[color & 0xff]
+                out[j + 2] = lut[(color >> 8) & 0xff]
+                out[j + 3] = lut[color >> 16]
+                j += 4
+            # Latched as the frame is handed to the driver, for light-on timestamps
+            self.sent_at = ticks_us64()
+            self.dma.config(read=out, write=self.sm, count=count, ctrl=self.dma_ctrl, trigger=True)
+        else:
+            out = self.tx_array
+            for i in range(count):
+                color = buf[i]
+                lut = luts[groups[i]]
+                out[i] = (lut[color >> 16] << 16) | (lut[(color >> 8) & 0xff] << 8) | lut[color & 0xff]
+            self.sent_at = ticks_us64()
+            if count < self.num_leds:
+                self.sm.put(self.tx_view[:count], 8)
+            else:
+                self.sm.put(out, 8)
+        self.sent_count = count
+        self.frame_end = self.sent_at + count * LED_US + RESET_US
+        self.frames_sent += 1
+        if recorder is not None:
+            recorder.record(self.strip_id, self.sent_at, buf, count)
+        return True
+
+# All strips by id (strip 0 is the one plain LED indices refer to)
+strips = []
+
+# Optional frame recorder (see enable_recorder)
+recorder = None
+
+def init(make_sm=None):
+    """
+    Initialize the WS2812B LED strips
+
+    Parameters:
+    make_sm (callable, optional): Returns the state machine for a strip id, e.g. a fake
+                                  that records put() calls when running on Linux
+    """
+    use_dma = getattr(config, 'LED_DMA_ENABLED', True)
+    for strip_id, strip_config in enumerate(STRIPS):
+        sm = make_sm(strip_id) if make_sm is not None else None
+        strip = Strip(strip_id, strip_config["name"], strip_config["pin"], strip_config["leds"], use_dma, sm)
+        strips.append(strip)
+        print(f"WS2812B strip '{strip.name}' initialized with {strip.num_leds} LEDs on pin {strip.pin} ({'DMA' if strip.dma else 'FIFO'})")
     
-    # Create the LED array
-    led_array = array.array("I", [0 for _ in range(config.NUM_LEDS)])
+    recorder_size = getattr(config, 'LED_RECORDER_SIZE', 0)
+    if recorder_size:
+        enable_recorder(recorder_size)
     
     # Turn off all LEDs initially
     pixels_fill(config.BLACK)
     pixels_show()
-    print(f"WS2812B LED strip initialized with {config.NUM_LEDS} LEDs on pin {config.WS2812B_PIN}")
+
+def enable_recorder(size=256):
+    """Start logging every flushed frame into a ring of size frames; returns the FrameRecorder"""
+    global recorder
+    recorder = FrameRecorder([strip.num_leds for strip in strips], size, LED_US, LATCH_US)
+    print(f"LED frame recorder enabled ({size} frames)")
+    return recorder
+
+def disable_recorder():
+    """Stop logging frames"""
+    global recorder
+    recorder = None
+
+def get_strip(name):
+    """Return the strip with the given name, or None"""
+    for strip in strips:
+        if strip.name == name:
+            return strip
+    return None
 
 def pixels_show():
-    """Update the LED strip with current values"""
-    led_sm.put(led_array, 8)
-    time.sleep_ms(10)
+    """Send every strip's whole frame now (waits only for frames still in flight)"""
+    for strip in strips:
+        strip.dirty_count = strip.num_leds
+    pixels_flush(wait=True)
+
+def frame_in_flight():
+    """Return True while any strip is still shifting out or latching a frame"""
+    for strip in strips:
+        if strip.in_flight():
+            return True
+    return False
+
+def pixels_flush(wait=False):
+    """
+    Send each strip's frame buffer if it changed; returns True when any frame was sent
+    
+    Parameters:
+    wait (bool): If a frame is still in flight, wait for it instead of leaving the
+                 change for a later flush (used when the frame must go out now)
+    """
+    sent = False
+    for strip in strips:
+        if strip.flush(wait):
+            sent = True
+    return sent
+
+def pixels_dirty():
+    """Return True when any frame buffer has changes waiting for pixels_flush()"""
+    for strip in strips:
+        if strip.dirty_count:
+            return True
+    return False
+
+def next_flush_deadline():
+    """Scheduler deadline: idle when clean, else as soon as a dirty strip has no frame in flight"""
+    earliest = None
+    for strip in strips:
+        if strip.dirty_count and (earliest is None or strip.frame_end < earliest):
+            earliest = strip.frame_end
+    return earliest
+
+def set_brightness(group, level):
+    """Set a group's brightness (0-255) by name; returns False for an unknown group"""
+    group_index = brightness.group_id(group)
+    if group_index is None:
+        return False
+    brightness.set_level(group_index, level)
+    # Every LED in the group may change, so resend the whole strips
+    for strip in strips:
+        strip.dirty_count = strip.num_leds
+    return True
+
+def get_brightness():
+    """Return the brightness level of every LED group"""
+    return brightness.get_levels()
+
+def get_led_stats():
+    """Return LED output counters for diagnostics"""
+    stats = {}
+    for strip in strips:
+        stats[strip.name] = {
+            'dma': strip.dma is not None,
+            'frames_sent': strip.frames_sent,
+            'frames_deferred': strip.frames_deferred,
+            'frame_in_flight': strip.in_flight()
+        }
+    return stats
+
+def frame_light_time(address):
+    """
+    Return (handoff_us, lit_us) for the last frame sent to the strip holding address
+
+    handoff_us is when the frame was handed to the driver; lit_us adds the time to shift
+    the frame out plus the calibrated LED_LATCH_US, i.e. when the LEDs showed it
+    """
+    strip = strips[address >> ADDR_SHIFT] if address >= 0 else strips[0]
+    return strip.sent_at, strip.sent_at + strip.sent_count * LED_US + LATCH_US
+
+def led_set(address, color):
+    """Set the LED at a mapping address (see led.mapping) to the given color"""
+    strips[address >> ADDR_SHIFT].set(address & ADDR_MASK, color)
+
+def led_mask(addresses):
+    """Compile mapping addresses into a list of per-strip LedMasks for led_set_mask()"""
+    by_strip = {}
+    for address in addresses:
+        # Drop unmapped (-1) and out-of-range addresses: set_words does not bounds-check in viper mode
+        if valid_address(address):
+            by_strip.setdefault(address >> ADDR_SHIFT, []).append(address & ADDR_MASK)
+    masks = []
+    for strip_id in sorted(by_strip):
+        masks.append(LedMask(strip_id, by_strip[strip_id]))
+    return masks
+
+def led_set_mask(masks, color):
+    """Set every LED in a compiled mask list to color"""
+    for mask in masks:
+        strips[mask.strip_id].apply_mask(mask, color)
+
+def pixels_fill_range(start, end, color):
+    """Set LEDs start..end-1 on the first strip to color"""
+    strips[0].fill_range(start, end, color)
 
 def pixels_set(i, color):
-    """Set a specific LED to the given color"""
-    if 0 <= i < config.NUM_LEDS:
-        led_array[i] = color
+    """Set a specific LED on the first strip to the given color (sent by the next pixels_flush())"""
+    strips[0].set(i, color)
 
 def pixels_fill(color):
-    """Set all LEDs to the same color"""
-    for i in range(len(led_array)):
-        led_array[i] = color
+    """Set all LEDs on every strip to the same color (sent by the next pixels_flush())"""
+    for strip in strips:
+        strip.fill(color)
         
 # def set_lane_light(lane_id, light_name, state):
 #     """Set a light in a specific lane to on/off state"""
@@ -62,15 +358,17 @@ def pixels_fill(color):
 #         else:
 #             pixels_set(led_index, config.TREE_COLORS["off"])
 #         pixels_show()
+def set_tree_light(lane_id, light_id, state):
+    """Set a lane's tree light by light id (see led.mapping) - one table lookup, no allocation"""
+    if 0 < lane_id <= MAX_LANE:
+        address = TREE_INDEX[lane_id * NUM_LIGHTS + light_id]
+        if address >= 0:
+            strips[address >> ADDR_SHIFT].set(address & ADDR_MASK, TREE_ON_COLOR[light_id] if state else TREE_OFF_COLOR)
+
 def set_lane_light(lane_id, light_name, state):
-    """Set a light in a specific lane to on/off state"""
-    if lane_id in config.LED_MAPPING and light_name in config.LED_MAPPING[lane_id]:
-        led_index = config.LED_MAPPING[lane_id][light_name]
-        print(f"Setting LED {led_index} for Lane {lane_id} {light_name} to {'ON' if state else 'OFF'}")
-        if state:
-            pixels_set(led_index, config.TREE_COLORS[light_name])
-        else:
-            pixels_set(led_index, config.TREE_COLORS["off"])
-        pixels_show()
+    """Set a light in a specific lane to on/off state (sent by the next pixels_flush())"""
+    light_id = LIGHT_IDS.get(light_name)
+    if light_id is not None:
+        set_tree_light(lane_id, light_id, state)
     else:
         print(f"Warning: LED not found for Lane {lane_id} {light_name}")
\ No newline at end of file
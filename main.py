@@ -1,8 +1,12 @@
 # Main program for Raspberry Pi Pico Drag Race Controller
 import time
 from machine import Pin
+import micropython
 import config
 
+# Reserve memory so exceptions raised inside sensor IRQ handlers can still be reported
+micropython.alloc_emergency_exception_buf(100)
+
 # Safety flag - set to True to prevent web server from starting automatically
 # Helps avoid getting locked out when developing
 SAFE_MODE = False
@@ -18,8 +22,12 @@ for i in range(10, 0, -1):
 # Import components
 from lane import Lane
 from race_manager import RaceManager
-from led.ws2812b import init as init_leds
-from led.animations import display_startup_sequence, win_animation, false_start_animation
+from timing.scheduler import Scheduler
+from timing.timebase import ticks_us64
+from inputs.debounce import PRESSED
+from led.ws2812b import init as init_leds, pixels_flush, next_flush_deadline
+from led.animations import startup_frames, startup_duration_ms, win_frames, false_start_frames, RESULT_ANIMATION_MS
+from led.animator import animator
 from led.aux_lighting import illuminate_sensors, clear_all_aux_leds
 
 # Import web server (if available)
@@ -99,15 +107,6 @@ def main():
     # Initialize hardware
     lanes, race_manager = initialize_hardware()
     
-    # Display startup sequence
-    display_startup_sequence()
-    
-    # Initialize auxiliary lighting
-    if hasattr(config, 'AUX_LED_MAPPING'):
-        print("Initializing auxiliary lighting...")
-        # Turn on sensor illumination
-        illuminate_sensors(True)
-    
     # Initial reset to ensure clean state
     race_manager.reset_race()
     
@@ -153,60 +152,72 @@ def main():
                 status = "SIMULATED" if config.LANE_SIMULATION_ENABLED[lane_idx] else "HARDWARE"
                 print(f"  Lane {lane_idx+1}: {status}")
     
-    # Main loop
-    while True:
-        # Check buttons for reset and start race
-        reset_button_state = race_manager.reset_btn.value()
-        if reset_button_state == 0 and race_manager.last_reset_btn_state == 1:  # Button press detected
+    def check_control_buttons():
+        """Check debounced buttons for reset and start race"""
+        now = ticks_us64()
+        if race_manager.reset_debouncer.update(race_manager.reset_btn.value(), now) == PRESSED:
             race_manager.reset_race()
             # Also clear any auxiliary LEDs
             if hasattr(config, 'AUX_LED_MAPPING'):
                 clear_all_aux_leds()
                 # Re-enable sensor illumination
                 illuminate_sensors(True)
-            time.sleep_ms(config.BUTTON_DEBOUNCE)  # Debounce
-        race_manager.last_reset_btn_state = reset_button_state
-        
-        start_button_state = race_manager.start_btn.value()
-        if start_button_state == 0 and race_manager.last_start_btn_state == 1 and not race_manager.race_started:  # Button press detected
-            race_manager.start_race()
-            time.sleep_ms(config.BUTTON_DEBOUNCE)  # Debounce
-        race_manager.last_start_btn_state = start_button_state
-    
-        # Update tree lights if race is running
-        if race_manager.tree_running:
-            race_manager.update_tree()
         
-        # Always check for player button presses
-        race_manager.check_player_buttons()
-        
-        # Update servo positions (non-blocking)
-        race_manager.update_servos()
-        
-        # Update secondary displays with cycling info
-        if display_controller:
-            display_controller.update_secondary_displays()
-
-        # Monitor race progress if race has started
-        if race_manager.race_started:
-            race_complete = race_manager.monitor_race()
-            if race_complete:
-                # Display win animation for lane with place = 1
-                for lane in race_manager.lanes:
-                    if lane.place == 1:
-                        win_animation(lane.lane_id)
-                    elif lane.false_start:
-                        false_start_animation(lane.lane_id)
-                
-                # Make sure to turn off all lights after animations
-                race_manager.reset_all_lights()
-                time.sleep_ms(100)  # Short delay
-                race_manager.reset_all_lights() # Try again just to be sure
-               
-                # Wait a moment before allowing a new race
-                time.sleep_ms(config.POST_RACE_DELAY)
-
-        time.sleep_ms(config.LOOP_DELAY)  # Small delay for responsive timing
+        if race_manager.start_debouncer.update(race_manager.start_btn.value(), now) == PRESSED:
+            if not race_manager.race_started and not race_manager.pre_start_pending:
+                race_manager.start_race()
+    
+    def monitor_race():
+        """Monitor race progress (also drains captured beam breaks)"""
+        race_complete = race_manager.monitor_race()
+        if race_complete:
+            # Display win animation for lane with place = 1 (all lanes animate together)
+            for lane in race_manager.lanes:
+                if lane.place == 1:
+                    animator.start(("lane", lane.lane_id), win_frames(lane.lane_id))
+                elif lane.false_start:
+                    animator.start(("lane", lane.lane_id), false_start_frames(lane.lane_id))
+            
+            # Turn off all lights after the animations, and wait a moment before allowing a new race
+            race_manager.post_race_until = ticks_us64() + (RESULT_ANIMATION_MS + config.POST_RACE_DELAY) * 1000
+            animator.start("post_race", post_race_frames())
+    
+    def boot_frames():
+        """Animation step that plays the startup sequence, then turns on the auxiliary lighting"""
+        yield from startup_frames()
+        if hasattr(config, 'AUX_LED_MAPPING'):
+            print("Initializing auxiliary lighting...")
+            # Turn on sensor illumination
+            illuminate_sensors(True)
+    
+    def post_race_frames():
+        """Animation step that clears the strip once the result animations have played"""
+        yield RESULT_ANIMATION_MS
+        race_manager.reset_all_lights()
+    
+    # The startup sequence plays from the main loop; races are held off until it has finished
+    race_manager.post_race_until = ticks_us64() + startup_duration_ms() * 1000
+    animator.start("startup", boot_frames())
+    
+    # Main loop: each subsystem runs only when its next deadline is due, and the
+    # loop sleeps until the earliest deadline or until a captured edge arrives
+    scheduler = Scheduler(wake_check=race_manager.edges_pending,
+                          wake_check_us=config.SCHEDULER_WAKE_CHECK_US)
+    scheduler.add("buttons", check_control_buttons, interval_us=config.BUTTON_POLL_INTERVAL * 1000)
+    scheduler.add("inputs", race_manager.sample_inputs, interval_us=race_manager.input_interval)
+    scheduler.add("tree", race_manager.update_tree, deadline=race_manager.next_tree_deadline)
+    scheduler.add("servos", race_manager.update_servos, deadline=race_manager.next_servo_deadline)
+    if display_controller:
+        scheduler.add("displays", display_controller.update_secondary_displays, deadline=display_controller.next_cycle_deadline)
+    scheduler.add("race", monitor_race, deadline=race_manager.next_monitor_deadline)
+    scheduler.add("animations", animator.update, deadline=animator.next_deadline)
+    scheduler.add("leds", pixels_flush, deadline=next_flush_deadline)  # One frame per pass for all light changes
+    if display_controller:
+        scheduler.add("live_clock", display_controller.update_live_clock, deadline=display_controller.next_live_deadline)
+        # Last, so queued I2C writes only use time left after the timing-critical tasks
+        scheduler.add("display_writes", display_controller.flush_updates, deadline=display_controller.next_update_deadline)
+    race_manager.scheduler = scheduler  # For diagnostics
+    scheduler.run_forever()
 
 if __name__ == "__main__":
     try:
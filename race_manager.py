@@ -2,7 +2,16 @@
 from machine import Pin
 import time
 import config
-from led.ws2812b import pixels_fill
+from led.ws2812b import pixels_fill, pixels_flush, get_led_stats, frame_light_time
+from led.mapping import GREEN, tree_led
+from led.animator import animator
+from inputs.edge_buffer import EdgeBuffer
+from inputs.debounce import Debouncer, PRESSED, RELEASED
+from inputs.pio_capture import create_pio_capture
+from inputs.lane_inputs import LaneInputs
+from inputs.timer_sampler import create_timer_sampler
+from timing.timebase import ticks_us64
+from timing.tree import build_tree_schedule
 
 # Create a global race_manager instance that will be initialized in main.py
 race_manager = None
@@ -16,16 +25,26 @@ class RaceManager:
         self.race_started = False
         self.tree_running = False
         self.tree_sequence_complete = False
+        self.pre_start_pending = False  # Counting down PRE_START_DELAY before the first tree stage
+        self.post_race_until = 0  # New races are held off until this time (startup sequence, or result animations + POST_RACE_DELAY)
         self.current_stage = None
         self.next_stage_time = 0
         self.race_start_time = 0
         self.race_timeout = config.RACE_TIMEOUT
+        
+        # Precomputed tree: list of (name, deadline_us, lights_off, lights_on), built by start_race()
+        self.tree_schedule = []
+        self.stage_index = 0
+        self.stage_lateness = []  # (stage name, microseconds late) for each processed stage
+        self.green_timing = None  # Audit record of how the green timestamp was taken
+        self.tree_mode = getattr(config, 'TREE_MODE', 'classic')
+        self.tree_spin_window = getattr(config, 'TREE_SPIN_WINDOW_US', 6000)
         self.place_counter = 1  # Counter for assigning finishing positions
         
-        # Button state tracking
-        self.last_start_btn_state = 1
-        self.last_reset_btn_state = 1
-        self.player_btn_states = [1] * len(lanes)  # Initial state for all player buttons
+        # Button debouncing (timestamp based, never sleeps)
+        button_settle_us = config.BUTTON_SETTLE_TIME * 1000
+        self.start_debouncer = Debouncer(button_settle_us)
+        self.reset_debouncer = Debouncer(button_settle_us)
         
         # Button event queue
         self.button_events = []
@@ -34,6 +53,45 @@ class RaceManager:
         self.all_staged = False
         self.staging_start_time = None
         self.staging_delay = None
+        self.staging_start_held = False  # Staging delay ran out during the hold-off; start when it ends
+        self.held_staging_starts = 0     # Staging auto-starts deferred by the hold-off (diagnostics)
+        
+        # Beam-break capture: lane sensors deliver timestamped edges through an edge source
+        # (pin IRQs into a ring buffer, or PIO state machines) instead of being polled
+        self.edge_source = None
+        self.edge_targets = {}  # GPIO number -> (lane, is_finish)
+        capture_mode = getattr(config, 'SENSOR_CAPTURE_MODE', 'poll')
+        if capture_mode == 'pio':
+            self.edge_source = create_pio_capture(lanes, getattr(config, 'PIO_CAPTURE_FREQ', 15000000))
+            if self.edge_source is None:
+                capture_mode = 'poll'
+        elif capture_mode == 'irq':
+            self.edge_source = EdgeBuffer(getattr(config, 'EDGE_BUFFER_SIZE', 64))
+            for lane in lanes:
+                lane.attach_edge_buffer(self.edge_source)
+        for lane in lanes:
+            if not lane.use_simulation:
+                self.edge_targets[lane.start_gpio] = (lane, False)
+                self.edge_targets[lane.finish_gpio] = (lane, True)
+        self.capture_mode = capture_mode
+        print(f"RaceManager: Sensor capture mode '{capture_mode}'")
+        
+        # Player buttons and any sensors not captured above are sampled together as one
+        # bitmask and glitch-filtered by a vertical counter
+        self.lane_inputs = LaneInputs(lanes, getattr(config, 'INPUT_FILTER_SAMPLES', 3),
+                                      read_mode=getattr(config, 'INPUT_READ_MODE', 'register'))
+        self.input_interval = getattr(config, 'INPUT_SAMPLE_INTERVAL_US', 1000)
+        # Optional fixed-rate sampling by a hardware timer; the main loop then only drains its buffer
+        self.input_sampler = create_timer_sampler(
+            self.lane_inputs.source,
+            getattr(config, 'INPUT_TIMER_RATE_HZ', 0),
+            getattr(config, 'INPUT_TIMER_BUFFER_SIZE', 256)
+        )
+        
+        # Main loop scheduling
+        self.scheduler = None  # Set by main.py, used for diagnostics
+        self.monitor_interval = getattr(config, 'RACE_MONITOR_INTERVAL_US', 1000)
+        self.last_monitor_time = 0
 
         # Set the global race_manager reference
         global race_manager
@@ -41,22 +99,35 @@ class RaceManager:
 
     def reset_race(self):
         """Reset the race to its initial state"""
+        # Stop result animations first so they can't redraw over the reset lights
+        animator.cancel_all()
+        self.post_race_until = 0
         for lane in self.lanes:
             lane.reset()
         print("Race reset.")
         self.race_started = False
         self.tree_running = False
         self.tree_sequence_complete = False
+        self.pre_start_pending = False  # Aborts a pending start immediately
         self.current_stage = None
         self.next_stage_time = 0
         self.race_start_time = 0
         self.place_counter = 1
+        self.tree_schedule = []
+        self.stage_index = 0
+        self.stage_lateness = []
+        self.green_timing = None
         
         # Clear button event queue
         self.button_events.clear()
         
+        # Drop any beam breaks captured while resetting
+        if self.edge_source is not None:
+            self.edge_source.clear()
+        
         # Clear all displays
         if self.display_controller:
+            self.display_controller.stop_live_clock()
             self.display_controller.clear_all()
             
             # Show ready status on displays
@@ -67,10 +138,19 @@ class RaceManager:
         self.all_staged = False
         self.staging_start_time = None
         self.staging_delay = None
+        self.staging_start_held = False
 
     def start_race(self):
-        """Start a new race with the light sequence"""
-        if not self.race_started and not self.tree_running:
+        """
+        Start a new race: the tree begins after PRE_START_DELAY without blocking the main loop
+
+        Returns True when the countdown started, False when a race is already running or the
+        startup or post-race animation is still holding new races off
+        """
+        if not self.race_started and not self.tree_running and not self.pre_start_pending:
+            if ticks_us64() < self.post_race_until:
+                print("Startup or post-race animation still running, start ignored")
+                return False
             print("Starting tree sequence...")
             
             # Keep staging lights on if enabled, but reset other lights
@@ -78,25 +158,57 @@ class RaceManager:
                 for light in ["amber1", "amber2", "amber3", "green", "red"]:
                     lane.set_light(light, 0)
             
-            # Add a delay before starting the sequence
+            # Precompute every stage as an absolute deadline, starting after the pre-start delay
             print(f"{config.PRE_START_DELAY//1000}-second delay before starting...")
-            time.sleep_ms(config.PRE_START_DELAY)
-            print("Starting light sequence now!")
-            
-            # Set up the first stage
-            self.current_stage = "amber1_on"
-            self.next_stage_time = time.ticks_add(time.ticks_ms(), 0)  # Start immediately
+            self.tree_schedule = build_tree_schedule(
+                self.tree_mode, ticks_us64() + config.PRE_START_DELAY * 1000,
+                config.LIGHT_ON_DURATION, config.TRANSITION_DELAY
+            )
+            self.stage_index = 0
+            self.stage_lateness = []
+            self.current_stage = self.tree_schedule[0][0]
+            self.next_stage_time = self.tree_schedule[0][1]
+            print(f"Tree mode '{self.tree_mode}': {len(self.tree_schedule)} stages")
             
-            self.tree_running = True
-            self.race_started = True
-            self.race_start_time = time.ticks_ms()
+            # The main loop advances the countdown in update_tree()
+            self.pre_start_pending = True
+            return True
+        return False
+
+    def begin_tree(self):
+        """End the pre-start countdown and start the race"""
+        print("Starting light sequence now!")
+        self.pre_start_pending = False
+        
+        # Ignore beam breaks captured before the race started
+        if self.edge_source is not None:
+            self.edge_source.clear()
+        
+        self.tree_running = True
+        self.race_started = True
+        self.race_start_time = self.tree_schedule[0][1]
 
     def update_tree(self):
-        """Update the light tree sequence"""
+        """Advance the pre-start countdown, staging delay and light tree (call every loop pass)"""
+        if self.pre_start_pending:
+            # Hand over to the tree once the first stage is within the spin window
+            if self.next_stage_time - ticks_us64() > self.tree_spin_window:
+                return
+            self.begin_tree()
+        
         if not self.tree_running or self.current_stage is None:
             # Check if staging delay has elapsed before starting race
             if not self.race_started and self.all_staged and self.staging_start_time is not None:
-                if time.ticks_diff(time.ticks_ms(), self.staging_start_time) >= self.staging_delay:
+                if ticks_us64() - self.staging_start_time >= self.staging_delay * 1000:
+                    # Keep the trigger latched until the startup or post-race hold-off ends
+                    if ticks_us64() < self.post_race_until:
+                        if not self.staging_start_held:
+                            self.staging_start_held = True
+                            self.held_staging_starts += 1
+                            print("All lanes staged during startup or post-race animation, starting when it ends")
+                        return
+                    self.staging_start_held = False
+                    
                     # Clear staging timer
                     self.staging_start_time = None
                     self.staging_delay = None
@@ -105,57 +217,88 @@ class RaceManager:
                     self.start_race()
             return
 
-        current_time = time.ticks_ms()
+        current_time = ticks_us64()
         
-        # Process the current stage if it's time
-        if time.ticks_diff(current_time, self.next_stage_time) >= 0:
+        # If the next stage is due within the spin window, wait for it here so it
+        # lands on its deadline instead of one loop pass late. Keep draining edges and
+        # sampling inputs while waiting so a beam break is not held up by the spin.
+        if 0 < self.next_stage_time - current_time <= self.tree_spin_window:
+            next_sample = current_time + self.input_interval
+            while self.tree_running:
+                now = ticks_us64()
+                if now >= self.next_stage_time:
+                    break
+                if self.edges_pending():
+                    self.process_sensor_edges()
+                # Timer samples can be drained at any time, but polled inputs keep their
+                # interval: the glitch filter counts samples, not microseconds
+                if self.input_sampler is not None or now >= next_sample:
+                    self.sample_inputs()
+                    next_sample = now + self.input_interval
+            current_time = ticks_us64()
+        
+        # Process every stage that is due (catches up in order after a stalled pass)
+        while self.current_stage is not None and current_time >= self.next_stage_time:
             self.process_stage()
 
+    def next_tree_deadline(self):
+        """Return when update_tree() next needs to run (64-bit us), or None when idle"""
+        if self.pre_start_pending or (self.tree_running and self.current_stage is not None):
+            # Wake early enough to spin onto the stage deadline
+            return self.next_stage_time - self.tree_spin_window
+        if not self.race_started and self.all_staged and self.staging_start_time is not None:
+            # A latched trigger waits for the hold-off to end
+            return max(self.staging_start_time + self.staging_delay * 1000, self.post_race_until)
+        return None
+
     def process_stage(self):
-        """Process the current stage of the light sequence"""
-        print(f"Processing stage: {self.current_stage}")
+        """Process the current stage of the light sequence (table lookup, no drift)"""
+        name, deadline, lights_off, lights_on = self.tree_schedule[self.stage_index]
+        lateness = ticks_us64() - deadline
+        self.stage_lateness.append((name, lateness))
+        print(f"Processing stage: {name} ({lateness} us late)")
         
-        if self.current_stage == "amber1_on":
-            self.set_light_on("amber1")
-            self.current_stage = "amber1_off"
-            self.next_stage_time = time.ticks_add(time.ticks_ms(), config.LIGHT_ON_DURATION)
-            
-        elif self.current_stage == "amber1_off":
-            self.set_light_off("amber1")
-            self.current_stage = "amber2_on"
-            self.next_stage_time = time.ticks_add(time.ticks_ms(), config.TRANSITION_DELAY)
-            
-        elif self.current_stage == "amber2_on":
-            self.set_light_on("amber2")
-            self.current_stage = "amber2_off"
-            self.next_stage_time = time.ticks_add(time.ticks_ms(), config.LIGHT_ON_DURATION)
-            
-        elif self.current_stage == "amber2_off":
-            self.set_light_off("amber2")
-            self.current_stage = "amber3_on"
-            self.next_stage_time = time.ticks_add(time.ticks_ms(), config.TRANSITION_DELAY)
-            
-        elif self.current_stage == "amber3_on":
-            self.set_light_on("amber3")
-            self.current_stage = "amber3_off"
-            self.next_stage_time = time.ticks_add(time.ticks_ms(), config.LIGHT_ON_DURATION)
-         
-        elif self.current_stage == "amber3_off":
-            self.set_light_off("amber3")
-            self.current_stage = "green_on"
-            self.next_stage_time = time.ticks_add(time.ticks_ms(), config.TRANSITION_DELAY)
-            
-        elif self.current_stage == "green_on":
-            self.set_light_on("green")
-            print("Green light! GO!")
-            self.current_stage = None  # Changed from "sequence_complete" to None to stop processing
-            self.tree_sequence_complete = True
-            
-            # Set start time for all lanes when green light comes on
-            current_time = time.ticks_ms()
-            for lane in self.lanes:
-                if lane.start_time is None:
-                    lane.start_time = current_time
+        for light_name in lights_off:
+            self.set_light_off(light_name)
+        for light_name in lights_on:
+            self.set_light_on(light_name)
+        
+        # Send the whole stage as one frame so every lane changes together
+        pixels_flush(wait=True)
+        
+        self.stage_index += 1
+        if self.stage_index < len(self.tree_schedule):
+            next_stage = self.tree_schedule[self.stage_index]
+            self.current_stage = next_stage[0]
+            self.next_stage_time = next_stage[1]
+            return
+        
+        print("Green light! GO!")
+        self.current_stage = None  # Stop processing
+        self.tree_sequence_complete = True
+        
+        # Start time is when each lane's green LED lit: the moment its frame was handed to
+        # the strip driver plus the frame's transmit time and the calibrated latch delay.
+        # It is also the false start reference: Lane compares each start edge's own
+        # timestamp with it, so a break before the LED lit is a foul even when the edge
+        # is handled afterwards (and never yields a negative reaction time)
+        deadline = self.tree_schedule[-1][1]
+        for lane in self.lanes:
+            handoff, lit = frame_light_time(tree_led(lane.lane_id, GREEN))
+            if lane.start_time is None:
+                lane.start_time = lit
+            if self.green_timing is None:
+                self.green_timing = {
+                    'deadline_us': deadline,
+                    'handoff_us': handoff,
+                    'latency_us': lit - handoff,
+                    'lit_us': lit,
+                    'handoff_late_us': handoff - deadline
+                }
+        print(f"Green handed to LEDs {self.green_timing['handoff_late_us']} us late, lit {self.green_timing['latency_us']} us later")
+        
+        if self.display_controller:
+            self.display_controller.start_live_clock(self.lanes)
 
     def set_light_on(self, light_name):
         """Turn on a specific light in all lanes"""
@@ -187,62 +330,82 @@ class RaceManager:
         for lane in self.lanes:
             for light in lane.tree_state:
                 lane.tree_state[light] = 0
+        pixels_flush(wait=True)
+
+    def sample_inputs(self):
+        """Sample all polled lane inputs and dispatch filtered sensor and player button edges"""
+        if self.input_sampler is not None:
+            # Samples were taken at a fixed rate by the timer; filter them in order
+            self.input_sampler.drain(self._handle_input_sample)
+        else:
+            self._handle_input_sample(self.lane_inputs.source.read(), ticks_us64())
+        
+        # Process any queued button events
+        self.process_button_events()
 
-    def check_player_buttons(self):
-        """Check all player buttons for state changes"""
+    def _handle_input_sample(self, raw, sample_time):
+        """Filter one raw GPIO sample and dispatch the input changes it completes"""
+        changed = self.lane_inputs.update(raw, sample_time)
+        if not changed:
+            return
+        active = self.lane_inputs.state
+        event_time = self.lane_inputs.edge_time
         for i, lane in enumerate(self.lanes):
-            current_state = lane.player_btn.value()
-            
-            # Button just pressed (transition from 1 to 0)
-            if current_state == 0 and self.player_btn_states[i] == 1:
-                if not self.race_started and config.STAGING_LIGHTS_ENABLED:
-                    # If race hasn't started, activate staging lights
-                    if not lane.prestaged:
-                        lane.prestaged = True
-                        lane.set_light("prestage", 1)
-                        print(f"Lane {lane.lane_id}: Pre-staged")
-                        
-                    # After pre-staged, move to staged
-                    elif not lane.staged:
-                        lane.staged = True
-                        lane.set_light("stage", 1)
-                        print(f"Lane {lane.lane_id}: Staged")
-                        
-                        # Check if all lanes are staged
-                        self.check_all_staged()
-                
-                # MODIFIED: Allow button press once race has started, regardless of tree sequence state
-                # This allows false starts during amber lights
-                elif self.race_started and not config.RELEASE_TO_START_MODE:
-                    # Queue the button press for processing
-                    self.button_events.append(('player', i))
-                    print(f"Lane {lane.lane_id}: Player button press detected and queued")
+            if changed & active & lane.start_mask:
+                self._handle_sensor_edge(lane.start_gpio, event_time)
+            if changed & active & lane.finish_mask:
+                self._handle_sensor_edge(lane.finish_gpio, event_time)
+            if changed & lane.button_mask:
+                self.on_player_button(i, PRESSED if active & lane.button_mask else RELEASED)
+
+    def on_player_button(self, i, edge):
+        """Handle a filtered press (PRESSED) or release (RELEASED) of lane i's player button"""
+        lane = self.lanes[i]
+        # Button just pressed
+        if edge == PRESSED:
+            if not self.race_started and config.STAGING_LIGHTS_ENABLED:
+                # If race hasn't started, activate staging lights
+                if not lane.prestaged:
+                    lane.prestaged = True
+                    lane.set_light("prestage", 1)
+                    print(f"Lane {lane.lane_id}: Pre-staged")
                     
-            # Button just released (transition from 0 to 1)
-            elif current_state == 1 and self.player_btn_states[i] == 0:
-                # In release-to-start mode, fire servo on button release
-                if self.race_started and config.RELEASE_TO_START_MODE:
-                    self.button_events.append(('player', i))
-                    print(f"Lane {lane.lane_id}: Player button release detected and queued")
+                # After pre-staged, move to staged
+                elif not lane.staged:
+                    lane.staged = True
+                    lane.set_light("stage", 1)
+                    print(f"Lane {lane.lane_id}: Staged")
                     
-                # If button released before race starts, turn off staging lights
-                elif not self.race_started:
-                    if lane.staged or lane.prestaged:
-                        print(f"Lane {lane.lane_id}: Staging cancelled")
-                        lane.staged = False
-                        lane.prestaged = False
-                        lane.set_light("stage", 0)
-                        lane.set_light("prestage", 0)
+                    # Check if all lanes are staged
+                    self.check_all_staged()
             
-            # Update last known state
-            self.player_btn_states[i] = current_state
-        
-        # Process any queued button events
-        self.process_button_events()    
+            # MODIFIED: Allow button press once race has started, regardless of tree sequence state
+            # This allows false starts during amber lights
+            elif self.race_started and not config.RELEASE_TO_START_MODE:
+                # Queue the button press for processing
+                self.button_events.append(('player', i))
+                print(f"Lane {lane.lane_id}: Player button press detected and queued")
+                
+        # Button just released
+        elif edge == RELEASED:
+            # In release-to-start mode, fire servo on button release
+            if self.race_started and config.RELEASE_TO_START_MODE:
+                self.button_events.append(('player', i))
+                print(f"Lane {lane.lane_id}: Player button release detected and queued")
+                
+            # If button released before race starts, turn off staging lights
+            elif not self.race_started:
+                if lane.staged or lane.prestaged:
+                    print(f"Lane {lane.lane_id}: Staging cancelled")
+                    lane.staged = False
+                    lane.prestaged = False
+                    lane.set_light("stage", 0)
+                    lane.set_light("prestage", 0)
+
     
     def check_all_staged(self):
         """Check if all lanes are staged and start sequence timer if needed"""
-        if self.race_started or not config.STAGING_AUTO_SEQUENCE:
+        if self.race_started or self.pre_start_pending or not config.STAGING_AUTO_SEQUENCE:
             return
             
         # Check if all lanes are staged
@@ -256,7 +419,7 @@ class RaceManager:
         if all_staged and not self.all_staged:
             self.all_staged = True
             print("All lanes staged! Starting delay sequence...")
-            self.staging_start_time = time.ticks_ms()
+            self.staging_start_time = ticks_us64()
             
             # Set random staging delay
             import random
@@ -290,22 +453,45 @@ class RaceManager:
             # Only check for finish if not already finished
             if not lane.finish_line_broken:
                 lane.check_finish()
-                
-                # Assign place position if lane just finished and doesn't have a place yet
-                if lane.finish_line_broken and not lane.false_start and lane.place is None:
-                    lane.place = self.place_counter
-                    self.place_counter += 1
-                    
-                    # Update display with position and time
-                    if self.display_controller:
-                        self.display_controller.show_position(lane.lane_id - 1, lane.place)
-                        if lane.finish_time is not None:
-                            self.display_controller.show_time(lane.lane_id - 1, lane.finish_time)
+                self.assign_place(lane)
+
+    def assign_place(self, lane):
+        """Assign a finishing position if the lane just finished and doesn't have a place yet"""
+        if lane.finish_line_broken and not lane.false_start and lane.place is None:
+            lane.place = self.place_counter
+            self.place_counter += 1
+            
+            # Update display with position and time
+            if self.display_controller:
+                self.display_controller.show_position(lane.lane_id - 1, lane.place)
+                if lane.finish_time is not None:
+                    self.display_controller.show_time(lane.lane_id - 1, lane.finish_time)
+
+    def process_sensor_edges(self):
+        """Drain beam breaks captured by the edge source in the order they happened"""
+        if self.edge_source is not None:
+            self.edge_source.drain(self._handle_sensor_edge)
+
+    def _handle_sensor_edge(self, pin_id, event_time):
+        """Dispatch one captured edge to its lane"""
+        # Edges outside a race (cars being placed, staging) are not timing events
+        if not self.race_started:
+            return
+        target = self.edge_targets.get(pin_id)
+        if target is None:
+            return
+        lane, is_finish = target
+        if is_finish:
+            if not lane.finish_line_broken:
+                lane.on_finish_edge(event_time)
+                self.assign_place(lane)
+        else:
+            lane.on_start_edge(event_time)
 
     def is_race_complete(self):
         """Check if the race is complete"""
         # Check if race has timed out
-        if time.ticks_diff(time.ticks_ms(), self.race_start_time) > self.race_timeout:
+        if ticks_us64() - self.race_start_time > self.race_timeout * 1000:
             print("Race timed out!")
             return True
             
@@ -334,8 +520,25 @@ class RaceManager:
         else:
             return f"{lane.place}th"
 
+    def edges_pending(self):
+        """Return True when captured beam breaks are waiting to be drained"""
+        return self.edge_source is not None and self.edge_source.pending() > 0
+
+    def next_monitor_deadline(self):
+        """Return when monitor_race() next needs to run (64-bit us), or None when idle"""
+        if self.edges_pending():
+            return 0
+        if self.race_started:
+            return self.last_monitor_time + self.monitor_interval
+        return None
+
     def monitor_race(self):
         """Monitor the progress of the current race"""
+        self.last_monitor_time = ticks_us64()
+        
+        # Drain captured beam breaks first so they are handled in capture order
+        self.process_sensor_edges()
+        
         if self.race_started:
             # Check start line sensors to detect red lights or reaction times
             self.check_start_line_sensors()
@@ -346,11 +549,8 @@ class RaceManager:
             # Check if auxiliary LED functions are available
             has_aux_leds = hasattr(config, 'AUX_LED_MAPPING')
             
-            # Update reaction time displays for lanes that have broken the start beam
+            # Reaction times were posted to the displays when each start beam broke
             for lane in self.lanes:
-                if lane.reaction_time is not None and self.display_controller:
-                    self.display_controller.show_reaction_time(lane.lane_id - 1, lane.reaction_time)
-                
                 # Update false start indicators using auxiliary LEDs
                 if has_aux_leds and lane.false_start:
                     # Import only if we need it (to avoid circular imports)
@@ -400,6 +600,9 @@ class RaceManager:
                         else:
                             print(f"  Reaction time: {lane.reaction_time} ms")
                 
+                if self.display_controller:
+                    self.display_controller.stop_live_clock()
+                
                 # End race state
                 self.tree_running = False
                 self.race_started = False
@@ -409,4 +612,38 @@ class RaceManager:
     def update_servos(self):
         """Update all servo positions (non-blocking)"""
         for lane in self.lanes:
-            lane.update_servo()
\ No newline at end of file
+            lane.update_servo()
+
+    def next_servo_deadline(self):
+        """Return the earliest pending servo close time (64-bit us), or None"""
+        earliest = None
+        for lane in self.lanes:
+            if lane.servo_closing_pending and (earliest is None or lane.servo_close_time < earliest):
+                earliest = lane.servo_close_time
+        return earliest
+
+    def get_diagnostics(self):
+        """Collect timing diagnostics from the race manager and main loop"""
+        diagnostics = {
+            'capture_mode': self.capture_mode,
+            'tree_mode': self.tree_mode,
+            'tree_lateness_us': self.stage_lateness,
+            'green_timing': self.green_timing,
+            'held_staging_starts': self.held_staging_starts,
+            'button_bounces': {
+                'start': self.start_debouncer.bounces,
+                'reset': self.reset_debouncer.bounces,
+                'player': [self.lane_inputs.glitches(lane.button_mask) for lane in self.lanes if lane.button_mask]
+            },
+            'input_filter_samples': self.lane_inputs.filter.samples,
+            'leds': get_led_stats()
+        }
+        if self.input_sampler is not None:
+            diagnostics['input_sampler'] = self.input_sampler.get_stats()
+        if self.display_controller is not None:
+            diagnostics['display_queue'] = self.display_controller.queue.get_stats()
+            diagnostics['i2c_buses'] = self.display_controller.get_bus_stats()
+            diagnostics['live_clock'] = self.display_controller.get_live_clock_stats()
+        if self.scheduler is not None:
+            diagnostics['scheduler'] = self.scheduler.get_stats()
+        return diagnostics
\ No newline at end of file
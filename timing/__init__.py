@@ -0,0 +1,10 @@
+# Timing package for Raspberry Pi Pico Drag Race Controller
+# This file makes the directory a package
+
+from timing.timebase import ticks_us64, from_ticks_us, us_to_ms
+from timing.tree import build_tree_schedule, TREE_CLASSIC, TREE_SPORTSMAN, TREE_PRO
+
+__all__ = [
+    'ticks_us64', 'from_ticks_us', 'us_to_ms',
+    'build_tree_schedule', 'TREE_CLASSIC', 'TREE_SPORTSMAN', 'TREE_PRO'
+]
@@ -0,0 +1,108 @@
+# Deadline-driven main loop scheduler for Raspberry Pi Pico Drag Race Controller
+# Each subsystem reports when it next needs to run; the loop runs only the tasks that
+# are due and sleeps until the earliest deadline (or until a captured edge arrives)
+import time
+from timing.timebase import ticks_us64
+
+class Task:
+    def __init__(self, name, run, deadline=None, interval_us=None):
+        """
+        A unit of main loop work
+
+        Parameters:
+        name (str): Name used in diagnostics
+        run (callable): Called with no arguments when the task is due
+        deadline (callable, optional): Returns the next 64-bit us time the task is due, or None when idle
+        interval_us (int, optional): Run periodically at this interval instead of asking for a deadline
+        """
+        self.name = name
+        self.run = run
+        self.deadline = deadline
+        self.interval_us = interval_us
+        self.next_run = 0  # Next due time for interval tasks
+
+        # Diagnostics
+        self.runs = 0
+        self.total_us = 0
+        self.max_us = 0
+        self.last_us = 0
+
+    def next_due(self):
+        """Return the next 64-bit us time this task is due, or None when idle"""
+        if self.interval_us is not None:
+            return self.next_run
+        return self.deadline()
+
+class Scheduler:
+    def __init__(self, wake_check=None, wake_check_us=500):
+        """
+        Parameters:
+        wake_check (callable, optional): Returns True when an event (e.g. a captured edge) needs handling now
+        wake_check_us (int): How often wake_check is polled while sleeping
+        """
+        self.tasks = []
+        self.wake_check = wake_check
+        self.wake_check_us = wake_check_us
+        self.passes = 0
+        self.sleep_us = 0  # Total time spent sleeping
+
+    def add(self, name, run, deadline=None, interval_us=None):
+        """Register a task; returns the Task"""
+        task = Task(name, run, deadline, interval_us)
+        self.tasks.append(task)
+        return task
+
+    def run_due(self):
+        """Run every task that is due and return the earliest next deadline (None if all idle)"""
+        self.passes += 1
+        earliest = None
+        for task in self.tasks:
+            now = ticks_us64()
+            due = task.next_due()
+            if due is not None and due <= now:
+                start = time.ticks_us()
+                task.run()
+                elapsed = time.ticks_diff(time.ticks_us(), start)
+                task.runs += 1
+                task.total_us += elapsed
+                task.last_us = elapsed
+                if elapsed > task.max_us:
+                    task.max_us = elapsed
+                if task.interval_us is not None:
+                    task.next_run = now + task.interval_us
+                due = task.next_due()
+            if due is not None and (earliest is None or due < earliest):
+                earliest = due
+        return earliest
+
+    def sleep_until(self, deadline):
+        """Sleep until deadline (64-bit us) or until wake_check reports an event"""
+        start = time.ticks_us()
+        while True:
+            if self.wake_check is not None and self.wake_check():
+                break
+            remaining = deadline - ticks_us64()
+            if remaining <= 0:
+                break
+            time.sleep_us(min(remaining, self.wake_check_us))
+        self.sleep_us += time.ticks_diff(time.ticks_us(), start)
+
+    def run_forever(self, idle_us=100000):
+        """Main loop: run due tasks, then sleep until the next one (at most idle_us when all are idle)"""
+        while True:
+            earliest = self.run_due()
+            if earliest is None:
+                earliest = ticks_us64() + idle_us
+            self.sleep_until(earliest)
+
+    def get_stats(self):
+        """Return per-task run time statistics for diagnostics"""
+        stats = {'passes': self.passes, 'sleep_us': self.sleep_us, 'tasks': {}}
+        for task in self.tasks:
+            stats['tasks'][task.name] = {
+                'runs': task.runs,
+                'total_us': task.total_us,
+                'max_us': task.max_us,
+                'last_us': task.last_us
+            }
+        return stats
@@ -0,0 +1,62 @@
+# Microsecond timebase for Raspberry Pi Pico Drag Race Controller
+# Extends the wrapping time.ticks_us() counter (2**30 us, ~18 minutes on the RP2040)
+# into a monotonic 64-bit microsecond count shared by lanes and the race manager
+import time
+import _thread
+
+try:
+    # Period of the ticks counters (TICKS_MAX + 1), derived from the running port
+    TICKS_PERIOD = time.ticks_add(0, -1) + 1
+    _ticks_us = time.ticks_us
+    _ticks_diff = time.ticks_diff
+except AttributeError:
+    # CPython (host-side tools and tests): emulate the RP2040's 2**30 us counter
+    TICKS_PERIOD = 1 << 30
+
+    def _ticks_us():
+        return int(time.perf_counter() * 1000000) & (TICKS_PERIOD - 1)
+
+    def _ticks_diff(end, start):
+        half = TICKS_PERIOD // 2
+        return ((end - start + half) & (TICKS_PERIOD - 1)) - half
+
+_last_raw = _ticks_us()  # Raw ticks_us() value seen on the previous call
+_base = 0                    # 64-bit time of raw tick 0 in the current wrap
+
+# The web server thread runs on the other core (rp2 threads have no GIL), so the
+# read-compare-update of the wrap state must not interleave: a stale _last_raw would
+# look like a wrap and jump the clock forward by TICKS_PERIOD. IRQ handlers only take
+# raw ticks_us() stamps, so they never wait on this lock.
+_lock = _thread.allocate_lock()
+
+def _advance():
+    """Read the raw counter and fold in any wrap; the caller holds _lock"""
+    global _last_raw, _base
+    raw = _ticks_us()
+    if raw < _last_raw:
+        # The raw counter wrapped since the last call
+        _base += TICKS_PERIOD
+    _last_raw = raw
+    return _base + raw
+
+def ticks_us64():
+    """
+    Return a monotonic 64-bit microsecond count
+    
+    Must be called at least once per TICKS_PERIOD so no wrap is missed;
+    the main loop calls it many times per second. Safe to call from both threads.
+    """
+    with _lock:
+        return _advance()
+
+def from_ticks_us(raw_stamp):
+    """Convert a recent raw time.ticks_us() stamp (e.g. taken in an IRQ) to the 64-bit timebase"""
+    with _lock:
+        now = _advance()
+        return now - _ticks_diff(_last_raw, raw_stamp)
+
+def us_to_ms(time_us):
+    """Round a microsecond duration to the nearest millisecond (None stays None)"""
+    if time_us is None:
+        return None
+    return (time_us + 500) // 1000
@@ -0,0 +1,52 @@
+# Christmas tree schedules for Raspberry Pi Pico Drag Race Controller
+# The whole light sequence is precomputed as absolute deadlines when a race starts,
+# so a late loop pass delays one stage but never shifts the stages after it
+
+TREE_CLASSIC = "classic"        # One amber at a time using LIGHT_ON_DURATION / TRANSITION_DELAY
+TREE_SPORTSMAN = "sportsman"    # .500 full tree: ambers 500 ms apart, green 500 ms after the last amber
+TREE_PRO = "pro"                # .400 pro tree: all ambers together, green 400 ms later
+
+# Stage offsets from the start of the tree, in milliseconds:
+# (name, offset_ms, lights to turn off, lights to turn on)
+SPORTSMAN_STAGES = (
+    ("amber1_on", 0, (), ("amber1",)),
+    ("amber2_on", 500, ("amber1",), ("amber2",)),
+    ("amber3_on", 1000, ("amber2",), ("amber3",)),
+    ("green_on", 1500, ("amber3",), ("green",)),
+)
+
+PRO_STAGES = (
+    ("ambers_on", 0, (), ("amber1", "amber2", "amber3")),
+    ("green_on", 400, ("amber1", "amber2", "amber3"), ("green",)),
+)
+
+def classic_stages(light_on_duration, transition_delay):
+    """Build the classic sequence stages from the configured durations (ms)"""
+    stages = []
+    offset = 0
+    for light in ("amber1", "amber2", "amber3"):
+        stages.append((light + "_on", offset, (), (light,)))
+        offset += light_on_duration
+        stages.append((light + "_off", offset, (light,), ()))
+        offset += transition_delay
+    stages.append(("green_on", offset, (), ("green",)))
+    return tuple(stages)
+
+def build_tree_schedule(mode, start_us, light_on_duration=1000, transition_delay=200):
+    """
+    Return the tree as a list of (name, deadline_us, lights_off, lights_on) stages
+    
+    Parameters:
+    mode (str): TREE_CLASSIC, TREE_SPORTSMAN or TREE_PRO
+    start_us (int): 64-bit microsecond time of the first stage
+    light_on_duration (int): Classic tree amber on time (ms)
+    transition_delay (int): Classic tree gap between ambers (ms)
+    """
+    if mode == TREE_PRO:
+        stages = PRO_STAGES
+    elif mode == TREE_SPORTSMAN:
+        stages = SPORTSMAN_STAGES
+    else:
+        stages = classic_stages(light_on_duration, transition_delay)
+    return [(name, start_us + offset_ms * 1000, lights_off, lights_on)
+            for name, offset_ms, lights_off, lights_on in stages]
@@ -0,0 +1,45 @@
+# Micro-benchmark for LED frame buffer writes
+# Compares per-LED pixels_set() loops with the bulk fill and mask operations.
+# Only the frame buffer is timed; nothing is sent to the strip.
+import time
+import config
+from led.ws2812b import init, get_strip, pixels_set, led_mask, led_set_mask
+from led.mapping import LANE_LEDS, MAX_LANE
+from led.bulk import VIPER_AVAILABLE
+
+ROUNDS = 100
+
+def timed(label, func):
+    """Run func ROUNDS times and print the average time per call"""
+    start = time.ticks_us()
+    for _ in range(ROUNDS):
+        func()
+    elapsed = time.ticks_diff(time.ticks_us(), start)
+    print(f"{label}: {elapsed // ROUNDS} us per call")
+
+init()
+strip = get_strip("main")
+num_leds = strip.num_leds
+lane_leds = LANE_LEDS[1] if MAX_LANE >= 1 else ()
+lane_mask = led_mask(lane_leds)
+
+def loop_fill():
+    for i in range(num_leds):
+        pixels_set(i, config.WHITE)
+
+def bulk_fill():
+    strip.fill_range(0, num_leds, config.WHITE)
+
+def loop_lane():
+    for led in lane_leds:
+        strip.set(led, config.GREEN)
+
+def mask_lane():
+    led_set_mask(lane_mask, config.GREEN)
+
+print(f"LED benchmark: {num_leds} LEDs, {len(lane_leds)} lane LEDs, viper={VIPER_AVAILABLE}")
+timed("pixels_set loop (whole strip)", loop_fill)
+timed("fill_range (whole strip)", bulk_fill)
+timed("set loop (lane 1)", loop_lane)
+timed("led_set_mask (lane 1)", mask_lane)
+print("Benchmark complete")
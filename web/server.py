@@ -165,7 +165,8 @@ def load_html_files():
                     fetch('/api/start')
                         .then(response => response.json())
                         .then(data => {
-                            document.getElementById('status').innerHTML = 'Race started!';
+                            document.getElementById('status').innerHTML =
+                                data.status === 'success' ? 'Race started!' : data.message;
                         });
                 }
                 
@@ -811,8 +812,9 @@ def handle_api_request(client_socket, method, path, headers, request):
         print("Could not parse API path")
         api_path = ""
     
-    # Check for a return parameter
+    # Check for a return parameter (other query parameters are kept for endpoints that use them)
     return_page = None
+    query = {}
     if '?' in path:
         query_string = path.split('?')[1]
         params = query_string.split('&')
@@ -820,6 +822,9 @@ def handle_api_request(client_socket, method, path, headers, request):
             if param.startswith('return='):
                 return_page = param.split('=')[1]
                 print(f"Return page specified: {return_page}")
+            elif '=' in param:
+                key, value = param.split('=', 1)
+                query[key] = value
     
     # Create JSON response
     response = {'status': 'error', 'message': 'Unknown command'}
@@ -831,15 +836,18 @@ def handle_api_request(client_socket, method, path, headers, request):
         if race_manager is None:
             print("ERROR: race_manager is None")
             response = {'status': 'error', 'message': 'Race manager not available'}
-        elif race_manager.race_started:
+        elif race_manager.race_started or race_manager.pre_start_pending:
             print("ERROR: Race already in progress")
             response = {'status': 'error', 'message': 'Race already in progress'}
         else:
             print("Calling race_manager.start_race()")
             try:
-                race_manager.start_race()
-                print("race_manager.start_race() completed successfully")
-                response = {'status': 'success', 'message': 'Race started'}
+                if race_manager.start_race():
+                    print("race_manager.start_race() completed successfully")
+                    response = {'status': 'success', 'message': 'Race started'}
+                else:
+                    print("race_manager.start_race() refused the start")
+                    response = {'status': 'error', 'message': 'Startup or post-race animation still running, start ignored'}
             except Exception as e:
                 print(f"ERROR in race_manager.start_race(): {e}")
                 response = {'status': 'error', 'message': f'Error starting race: {str(e)}'}
@@ -914,6 +922,46 @@ def handle_api_request(client_socket, method, path, headers, request):
 #             except Exception as e:
 #                 print(f"Error generating HTML response: {e}")
         
+    elif api_path.startswith('diagnostics'):
+        # Timing diagnostics (scheduler task run times, tree lateness, capture counters)
+        if race_manager:
+            try:
+                response = race_manager.get_diagnostics()
+            except Exception as e:
+                print(f"Error generating diagnostics: {e}")
+                response = {'status': 'error', 'message': f'Error generating diagnostics: {str(e)}'}
+        else:
+            response = {'status': 'error', 'message': 'Race manager not available'}
+    
+    elif api_path.startswith('brightness'):
+        # LED brightness per group: /api/brightness?group=tree&level=64 sets, no parameters reads
+        try:
+            from led.ws2812b import set_brightness, get_brightness
+            if 'group' in query and 'level' in query:
+                if set_brightness(query['group'], int(query['level'])):
+                    response = {'status': 'success', 'brightness': get_brightness()}
+                else:
+                    response = {'status': 'error', 'message': f"Unknown LED group: {query['group']}"}
+            else:
+                response = {'status': 'success', 'brightness': get_brightness()}
+        except Exception as e:
+            print(f"Error setting brightness: {e}")
+            response = {'status': 'error', 'message': f'Error setting brightness: {str(e)}'}
+    
+    elif api_path.startswith('frames'):
+        # LED frame log (config.LED_RECORDER_SIZE): /api/frames exports, /api/frames?clear=1 exports and clears
+        try:
+            import led.ws2812b as ws2812b
+            if ws2812b.recorder is None:
+                response = {'status': 'error', 'message': 'LED frame recorder disabled (set LED_RECORDER_SIZE)'}
+            else:
+                response = ws2812b.recorder.export()
+                if query.get('clear') == '1':
+                    ws2812b.recorder.clear()
+        except Exception as e:
+            print(f"Error exporting LED frames: {e}")
+            response = {'status': 'error', 'message': f'Error exporting LED frames: {str(e)}'}
+    
     elif api_path.startswith('status'):
         # Get race status (omit detailed debug for this frequent call)
         if race_manager:
@@ -921,7 +969,11 @@ def handle_api_request(client_socket, method, path, headers, request):
                 status = {
                     'race_started': race_manager.race_started,
                     'tree_running': race_manager.tree_running,
+                    'pre_start': race_manager.pre_start_pending,
                     'light_sequence': race_manager.current_stage,
+                    'tree_mode': race_manager.tree_mode,
+                    'tree_lateness_us': race_manager.stage_lateness,
+                    'green_timing': race_manager.green_timing,
                     'lanes': []
                 }
                 
@@ -931,6 +983,9 @@ def handle_api_request(client_socket, method, path, headers, request):
                         'lane_id': lane.lane_id,
                         'finish_time': lane.finish_time,
                         'reaction_time': lane.reaction_time,
+                        'finish_time_us': lane.finish_time_us,
+                        'reaction_time_us': lane.reaction_time_us,
+                        'green_time_us': lane.start_time,
                         'false_start': lane.false_start,
                         'place': lane.place,
                         'staged': lane.staged,
@@ -949,7 +1004,7 @@ def handle_api_request(client_socket, method, path, headers, request):
         print(f"Unknown API endpoint: {api_path}")
     
     # Send JSON response
-    print(f"Sending response: {response if not api_path.startswith('status') else '(status data)'}")
+    print(f"Sending response: {response if not (api_path.startswith('status') or api_path.startswith('frames')) else '(status data)'}")
     send_response(client_socket, 200, 'application/json', json.dumps(response))
 
 def send_response(client_socket, status_code, content_type, content):